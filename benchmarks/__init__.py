@@ -0,0 +1,22 @@
+"""Ad-hoc performance benchmarks for the ingest path.
+
+Run from the project root, e.g. ``python -m benchmarks.bench_fetch``.
+"""
+import os
+
+
+def setup_django(database_url=None):
+    """Configure Django the same way manage.py does, defaulting to the local SQLite database.
+
+    `database_url` (e.g. ``postgres://...``) points the default database elsewhere.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "content_aggregator.settings")
+    os.environ.setdefault("DEVELOPMENT_MODE", "True")
+
+    if database_url:
+        import dj_database_url
+        from django.conf import settings
+        settings.DATABASES = {"default": dj_database_url.parse(database_url)}
+
+    import django
+    django.setup()
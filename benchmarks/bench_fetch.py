@@ -0,0 +1,68 @@
+"""Compare serial feed downloads against the concurrent fetcher.
+
+Serves one category's worth of feeds from a local stand-in server, each with
+its own artificial latency, and times:
+
+* serial: ``feedparser.parse(url)`` per feed, as ``fetch_and_save`` used to do
+* concurrent: ``blog.fetcher.fetch_feeds`` followed by ``parse_document``
+
+The serial run should take roughly the sum of the latencies, the concurrent
+one roughly the slowest single feed.
+
+Usage: python -m benchmarks.bench_fetch [--feeds 13] [--seed 1]
+"""
+import argparse
+import logging
+import random
+import time
+
+from benchmarks import setup_django
+from benchmarks.server import StandInServer, make_rss
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--feeds", type=int, default=13, help="feeds per category (fetch_ai_content has 13)")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    setup_django()
+    import feedparser
+    from blog.fetcher import fetch_feeds
+    from blog.http_client import connection_stats
+    from blog.normalize import parse_document
+
+    rng = random.Random(args.seed)
+    latencies = [round(rng.uniform(0.1, 1.2), 2) for _ in range(args.feeds)]
+
+    with StandInServer() as server:
+        urls = [
+            server.add_route(f"/feed/{i}.xml", make_rss(f"feed{i}"), delay=delay)
+            for i, delay in enumerate(latencies)
+        ]
+
+        started = time.perf_counter()
+        serial_entries = sum(len(feedparser.parse(url).entries) for url in urls)
+        serial = time.perf_counter() - started
+
+        # Every stand-in feed shares one host, so lift the per-host cap to model
+        # a real category where each feed lives on a different site. That also
+        # opens more connections to it than its pool keeps, which is expected.
+        logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
+        started = time.perf_counter()
+        results = fetch_feeds(urls, max_workers=len(urls), per_host_limit=len(urls))
+        concurrent_entries = sum(len(parse_document(result.content, result.url, result.headers).entries) for result in results if result.ok)
+        concurrent = time.perf_counter() - started
+
+    print(f"feeds:                 {len(urls)}")
+    print(f"sum of latencies:      {sum(latencies):6.2f}s")
+    print(f"slowest feed:          {max(latencies):6.2f}s")
+    print(f"serial wall-clock:     {serial:6.2f}s ({serial_entries} entries)")
+    print(f"concurrent wall-clock: {concurrent:6.2f}s ({concurrent_entries} entries)")
+    print(f"speed-up:              {serial / concurrent:6.1f}x")
+    stats = connection_stats()["feeds"]
+    print(f"connections:           {stats['connections']} for {stats['requests']} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare header-only image probing against full downloads.
+
+Serves a corpus of generated PNG/JPEG/GIF/WebP images from a local stand-in
+server throttled to a fixed bandwidth, then probes each one twice through
+``blog.imagesize.read_image_size``: once with the full-download fallback
+forced (``header_bytes=0``, what ``validate_image_url`` used to do) and once
+in header mode. Reports bytes transferred and latency per image.
+
+Usage: python -m benchmarks.bench_image_probe [--rate-mbps 40] [--seed 1]
+"""
+import argparse
+import random
+import time
+from io import BytesIO
+
+import requests
+from PIL import Image
+
+from benchmarks import setup_django
+from benchmarks.server import StandInServer
+
+
+# (format, size, content type, save options)
+CORPUS = [
+    ("JPEG", (2400, 1600), "image/jpeg", {"quality": 90}),
+    ("JPEG", (1200, 800), "image/jpeg", {"quality": 85, "progressive": True}),
+    ("PNG", (1600, 1000), "image/png", {}),
+    ("GIF", (800, 600), "image/gif", {}),
+    ("WEBP", (2000, 1300), "image/webp", {"quality": 80}),
+    ("WEBP", (1000, 700), "image/webp", {"lossless": True}),
+]
+
+
+def make_image(rng, fmt, size, options):
+    """Random noise compresses poorly, so file sizes resemble real photos."""
+    width, height = size
+    img = Image.frombytes("RGB", size, rng.randbytes(width * height * 3))
+    buffer = BytesIO()
+    img.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def probe(url, header_bytes):
+    from blog.imagesize import read_image_size
+
+    started = time.perf_counter()
+    with requests.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        size = read_image_size(response, header_bytes)
+    return size, time.perf_counter() - started
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--rate-mbps", type=float, default=40.0, help="simulated server bandwidth")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    rng = random.Random(args.seed)
+    rate = args.rate_mbps * 1_000_000 / 8
+
+    totals = {"full": [0, 0.0], "header": [0, 0.0]}
+    with StandInServer() as server:
+        print(f"{'image':<36} {'file':>9} {'full bytes':>11} {'full ms':>8} {'header bytes':>13} {'header ms':>10}")
+        for i, (fmt, size, content_type, options) in enumerate(CORPUS):
+            body = make_image(rng, fmt, size, options)
+            url = server.add_route(f"/img/{i}.{fmt.lower()}", body, content_type=content_type, rate=rate)
+
+            full, full_time = probe(url, header_bytes=0)
+            header, header_time = probe(url, header_bytes=settings.IMAGE_PROBE_HEADER_BYTES)
+            assert (full.width, full.height) == (header.width, header.height) == size
+
+            totals["full"][0] += full.bytes_read
+            totals["full"][1] += full_time
+            totals["header"][0] += header.bytes_read
+            totals["header"][1] += header_time
+            label = f"{fmt} {size[0]}x{size[1]} {'/'.join(options)}"
+            print(
+                f"{label:<36} {len(body):>9} {full.bytes_read:>11} {full_time * 1000:>8.1f}"
+                f" {header.bytes_read:>13} {header_time * 1000:>10.1f}"
+            )
+
+    full_bytes, full_time = totals["full"]
+    header_bytes, header_time = totals["header"]
+    print(f"\ntotal bytes: {full_bytes} full vs {header_bytes} header ({full_bytes / header_bytes:.0f}x less)")
+    print(f"total time:  {full_time:.2f}s full vs {header_time:.2f}s header ({full_time / header_time:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
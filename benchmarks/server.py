@@ -0,0 +1,96 @@
+"""Local stand-in HTTP server with artificial latency.
+
+Routes are registered as ``path -> (body, content_type, delay_seconds, rate)``;
+the server sleeps for the configured delay before answering, and optionally
+trickles the body out at ``rate`` bytes/second, so benchmarks can simulate
+slow remote hosts without touching the network.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+_CHUNK_SIZE = 16 * 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like real feed and image hosts
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        route = self.server.routes.get(self.path)
+        if route is None:
+            self.send_error(404)
+            return
+        body, content_type, delay, rate = route
+        if delay:
+            time.sleep(delay)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        chunk_size = _CHUNK_SIZE if rate else len(body)
+        try:
+            for start in range(0, len(body), chunk_size):
+                chunk = body[start:start + chunk_size]
+                self.wfile.write(chunk)
+                self.server.bytes_sent += len(chunk)
+                if rate:
+                    time.sleep(len(chunk) / rate)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading early, e.g. a header-only image probe
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """Threaded HTTP server bound to localhost on a random free port."""
+
+    def __init__(self):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.routes = {}
+        self._httpd.bytes_sent = 0
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def bytes_sent(self):
+        return self._httpd.bytes_sent
+
+    def add_route(self, path, body, content_type="application/rss+xml", delay=0.0, rate=None):
+        self._httpd.routes[path] = (body, content_type, delay, rate)
+        return self.base_url + path
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def make_rss(title, items=10):
+    """Build a small RSS 2.0 document with `items` entries."""
+    entries = "".join(
+        f"<item><title>{title} item {i}</title>"
+        f"<link>https://example.com/{title}/{i}</link>"
+        f"<guid>{title}-{i}</guid>"
+        f"<description>Entry {i} of {title}</description>"
+        f"<pubDate>Mon, 06 Jan 2025 12:{i:02d}:00 GMT</pubDate></item>"
+        for i in range(items)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<rss version="2.0"><channel><title>{title}</title>{entries}</channel></rss>'
+    ).encode("utf-8")
@@ -1,11 +1,14 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.utils import timezone
 
 from .models import (
-    GeneralContent, PythonContent, CyberSecurityContent,
+    Content, GeneralContent, PythonContent, CyberSecurityContent,
     SoftwareDevelopmentContent, UiUxContent, MobilePcContent,
     JobUpdatesContent, CryptoContent, RSSFeed, UserBookmark
 )
+from .stats import content_counter, increment
+from .versions import bump_versions
 
 
 class BaseContentAdmin(admin.ModelAdmin):
@@ -20,6 +23,24 @@ class BaseContentAdmin(admin.ModelAdmin):
     has_image.boolean = True
     has_image.short_description = 'Image'
 
+    # Saves are tracked through post_save; deletes stay signal-free so they can be fast
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_versions([obj.category])
+        increment({content_counter(obj.category): -1})
+
+    def delete_queryset(self, request, queryset):
+        counts = dict(queryset.order_by().values_list('category').annotate(Count('pk')))
+        super().delete_queryset(request, queryset)
+        bump_versions(counts)
+        increment({content_counter(category): -count for category, count in counts.items()})
+
+
+@admin.register(Content)
+class ContentAdmin(BaseContentAdmin):
+    list_display = ('title', 'category', 'content_name', 'pub_date', 'has_image')
+    list_filter = ('category', 'pub_date')
+
 
 @admin.register(GeneralContent)
 class GeneralContentAdmin(BaseContentAdmin):
@@ -63,17 +84,25 @@ class CryptoContentAdmin(BaseContentAdmin):
 
 @admin.register(RSSFeed)
 class RSSFeedAdmin(admin.ModelAdmin):
-    list_display = ('name', 'category', 'is_active', 'last_fetched', 'has_error')
+    list_display = ('name', 'category', 'is_active', 'last_fetched', 'next_fetch_at', 'cache_hit_rate', 'has_error')
     list_filter = ('category', 'is_active')
     search_fields = ('name', 'url')
-    readonly_fields = ('last_fetched', 'fetch_error', 'created_at')
-    actions = ['activate_feeds', 'deactivate_feeds', 'clear_errors']
+    readonly_fields = (
+        'last_fetched', 'next_fetch_at', 'fetch_error', 'created_at',
+        'etag', 'last_modified', 'cache_hits', 'cache_misses',
+        'poll_interval', 'update_interval', 'failure_count',
+    )
+    actions = ['activate_feeds', 'deactivate_feeds', 'clear_errors', 'fetch_now']
 
     def has_error(self, obj):
         return bool(obj.fetch_error)
     has_error.boolean = True
     has_error.short_description = 'Error'
 
+    def cache_hit_rate(self, obj):
+        return f"{obj.cache_hit_ratio:.0%}"
+    cache_hit_rate.short_description = 'Cache hits'
+
     @admin.action(description='Activate selected feeds')
     def activate_feeds(self, request, queryset):
         queryset.update(is_active=True)
@@ -84,7 +113,11 @@ class RSSFeedAdmin(admin.ModelAdmin):
 
     @admin.action(description='Clear fetch errors')
     def clear_errors(self, request, queryset):
-        queryset.update(fetch_error='')
+        queryset.update(fetch_error='', failure_count=0)
+
+    @admin.action(description='Fetch on the next scheduler run')
+    def fetch_now(self, request, queryset):
+        queryset.update(next_fetch_at=None)
 
 
 @admin.register(UserBookmark)
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from .stats import connect_signals
+        from .versions import content_changed
+
+        # Proxy models send signals under their own class, so listen for all senders. There is
+        # no post_delete receiver: one would stop retention's batch deletes from being fast
+        # deletes, so deleters bump the version themselves.
+        post_save.connect(content_changed, dispatch_uid='content_version_save')
+        connect_signals()
@@ -0,0 +1,50 @@
+import time
+
+from django.core.cache import cache
+
+
+class HostCircuitBreaker:
+    """Skips hosts that keep failing until an exponentially growing cool-down ends.
+
+    Consecutive failures per host are counted in the Django cache, so every
+    worker sharing the cache sees the same state. Once a host reaches
+    `threshold` failures the breaker opens for `base_cooldown` seconds,
+    doubling with every further failure up to `max_cooldown`; a single
+    success closes it again.
+    """
+
+    def __init__(self, name, threshold, base_cooldown, max_cooldown):
+        self.name = name
+        self.threshold = threshold
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+
+    def _key(self, host):
+        return f"breaker:{self.name}:{host}"
+
+    def _failures_key(self, host):
+        return f"breaker:{self.name}:{host}:failures"
+
+    def is_open(self, host):
+        open_until = cache.get(self._key(host))
+        return open_until is not None and open_until > time.time()
+
+    def record_failure(self, host):
+        # add + incr are atomic, so failures in concurrent probes all count
+        key = self._failures_key(host)
+        timeout = self.max_cooldown * 2
+        cache.add(key, 0, timeout=timeout)
+        try:
+            failures = cache.incr(key)
+        except ValueError:
+            # Expired between the two calls
+            cache.set(key, 1, timeout=timeout)
+            failures = 1
+        # Forget hosts that have been quiet for a while
+        cache.touch(key, timeout)
+        if failures >= self.threshold:
+            cooldown = min(self.base_cooldown * 2 ** (failures - self.threshold), self.max_cooldown)
+            cache.set(self._key(host), time.time() + cooldown, timeout=cooldown)
+
+    def record_success(self, host):
+        cache.delete_many([self._key(host), self._failures_key(host)])
@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+
+from .http_client import feed_session
+
+
+@dataclass
+class FetchResult:
+    """Outcome of downloading a single feed."""
+    url: str
+    status: int = 0
+    content: bytes = b""
+    headers: dict = field(default_factory=dict)
+    error: str = ""
+    elapsed: float = 0.0
+
+    @property
+    def ok(self):
+        return not self.error and self.status == 200
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+
+def _host(url):
+    return (urlparse(url).hostname or "").lower()
+
+
+def _fetch_one(url, extra_headers, host_slot, deadline, timeout):
+    started = time.monotonic()
+    remaining = deadline - started
+    if remaining <= 0 or not host_slot.acquire(timeout=remaining):
+        return FetchResult(url, error="time budget exceeded")
+    try:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return FetchResult(url, error="time budget exceeded")
+        response = feed_session.get(
+            url,
+            headers=extra_headers,
+            timeout=(min(settings.HTTP_CONNECT_TIMEOUT, remaining), min(timeout, remaining)),
+        )
+        return FetchResult(
+            url,
+            status=response.status_code,
+            content=response.content,
+            headers={key.lower(): value for key, value in response.headers.items()},
+            error="" if response.ok or response.status_code == 304 else f"HTTP {response.status_code}",
+            elapsed=time.monotonic() - started,
+        )
+    except requests.exceptions.RequestException as e:
+        return FetchResult(url, error=str(e), elapsed=time.monotonic() - started)
+    finally:
+        host_slot.release()
+
+
+def iter_feeds(urls, request_headers=None, max_workers=None, per_host_limit=None, timeout=None, budget=None):
+    """Download feeds concurrently, yielding each `FetchResult` as soon as it is ready.
+
+    At most `per_host_limit` requests hit the same host at once, and the whole
+    batch must finish within `budget` seconds; feeds still pending when the
+    budget runs out come back with an error instead of holding up the rest.
+
+    `request_headers` optionally maps a URL to extra headers for that request,
+    e.g. the conditional-GET validators stored on its `RSSFeed`.
+    """
+    max_workers = max_workers or settings.FEED_FETCH_MAX_WORKERS
+    per_host_limit = per_host_limit or settings.FEED_FETCH_PER_HOST_LIMIT
+    timeout = timeout or settings.FEED_FETCH_TIMEOUT
+    budget = budget or settings.FEED_FETCH_TIME_BUDGET
+
+    urls = list(urls)
+    request_headers = request_headers or {}
+    if not urls:
+        return
+
+    deadline = time.monotonic() + budget
+    host_slots = {host: threading.BoundedSemaphore(per_host_limit) for host in map(_host, urls)}
+
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="feed-fetch")
+    try:
+        pending = {
+            pool.submit(
+                _fetch_one, url, request_headers.get(url, {}), host_slots[_host(url)], deadline, timeout
+            ): url
+            for url in urls
+        }
+        try:
+            for future in as_completed(list(pending), timeout=max(0, deadline - time.monotonic())):
+                del pending[future]
+                yield future.result()
+        except FutureTimeoutError:
+            for future, url in pending.items():
+                # Downloads that finished while the caller was busy still count
+                if future.done() and not future.cancelled():
+                    yield future.result()
+                else:
+                    yield FetchResult(url, error="time budget exceeded")
+    finally:
+        # Don't block the caller on stragglers; their own timeouts end them shortly.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_feeds(urls, **kwargs):
+    """Download feeds concurrently and return a `FetchResult` per URL, in input order.
+
+    Takes the same arguments as `iter_feeds`.
+    """
+    urls = list(urls)
+    results = {result.url: result for result in iter_feeds(urls, **kwargs)}
+    return [results[url] for url in urls]
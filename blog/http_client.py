@@ -0,0 +1,123 @@
+"""Shared, pooled HTTP sessions for ingestion traffic.
+
+`feed_session` downloads feeds and `image_session` probes images. Both keep
+up to `HTTP_POOL_PER_HOST` keep-alive connections per host (for up to
+`HTTP_POOL_HOSTS` hosts), ask for compressed responses and apply the same
+connect/read timeouts unless a call passes its own. `image_session` only
+connects to addresses vetted by `blog.resolver.safe_resolver`, since image
+URLs come from untrusted feed content.
+
+Each session counts the requests it sends and the TCP connections it opens;
+`connection_stats()` reports how many requests reused a pooled connection.
+"""
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+
+from .resolver import PinnedConnectionMixin
+
+
+USER_AGENT = "content-aggregator/1.0 (+https://blog.lumestri.dev/)"
+
+
+class ConnectionStats:
+    """Thread-safe counters of requests sent and connections opened."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def snapshot(self):
+        with self._lock:
+            requests_sent, connections = self.requests, self.connections
+        reused = max(0, requests_sent - connections)
+        return {
+            'requests': requests_sent,
+            'connections': connections,
+            'reused': reused,
+            'reuse_ratio': reused / requests_sent if requests_sent else 0.0,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.requests = self.connections = 0
+
+
+class _CountingConnectionMixin:
+    stats = None
+
+    def _new_conn(self):
+        sock = super()._new_conn()
+        self.stats.record_connection()
+        return sock
+
+
+def _pool_classes(stats, pinned):
+    """Connection pool classes whose connections report to `stats`."""
+    classes = {}
+    for scheme, pool_class in (('http', HTTPConnectionPool), ('https', HTTPSConnectionPool)):
+        mixins = (_CountingConnectionMixin, PinnedConnectionMixin) if pinned else (_CountingConnectionMixin,)
+        connection_class = type(
+            f"Ingest{pool_class.ConnectionCls.__name__}",
+            (*mixins, pool_class.ConnectionCls),
+            {'stats': stats},
+        )
+        classes[scheme] = type(f"Ingest{pool_class.__name__}", (pool_class,), {'ConnectionCls': connection_class})
+    return classes
+
+
+class IngestAdapter(HTTPAdapter):
+    """Transport adapter with per-host keep-alive pools that counts its traffic."""
+
+    def __init__(self, stats, pinned=False):
+        self.stats = stats
+        self.pinned = pinned
+        super().__init__(pool_connections=settings.HTTP_POOL_HOSTS, pool_maxsize=settings.HTTP_POOL_PER_HOST)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _pool_classes(self.stats, self.pinned)
+
+    def send(self, request, **kwargs):
+        # Counted here rather than in Session.request so redirects are included
+        self.stats.record_request()
+        return super().send(request, **kwargs)
+
+
+class IngestSession(requests.Session):
+    """`requests.Session` with the ingestion defaults described above."""
+
+    def __init__(self, pinned=False):
+        super().__init__()
+        self.stats = ConnectionStats()
+        self.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING})
+        adapter = IngestAdapter(self.stats, pinned=pinned)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+feed_session = IngestSession()
+image_session = IngestSession(pinned=True)
+
+
+def connection_stats():
+    """Request and connection counts of the ingestion sessions in this process."""
+    return {'feeds': feed_session.stats.snapshot(), 'images': image_session.stats.snapshot()}
@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .models import ImageProbe
+
+
+class LRUCache:
+    """Small thread-safe least-recently-used mapping."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_probes = LRUCache(settings.IMAGE_PROBE_LRU_SIZE)
+_URL_MAX_LENGTH = ImageProbe._meta.get_field('url').max_length
+
+
+def _is_fresh(probe, now):
+    ttl = settings.IMAGE_PROBE_NEGATIVE_TTL if probe.failed else settings.IMAGE_PROBE_TTL
+    return probe.checked_at >= now - timedelta(seconds=ttl)
+
+
+def get_cached_probe(url):
+    """Return a still-fresh `ImageProbe` for `url` from memory or the database, else None."""
+    now = timezone.now()
+    probe = _probes.get(url)
+    if probe is not None and _is_fresh(probe, now):
+        return probe
+    if len(url) > _URL_MAX_LENGTH:
+        return None
+    probe = ImageProbe.objects.filter(url=url).first()
+    if probe is not None and _is_fresh(probe, now):
+        _probes.set(url, probe)
+        return probe
+    return None
+
+
+def store_probe(url, width=0, height=0, content_type='', failed=False):
+    """Record a fresh probe result in both cache layers and return it."""
+    values = {
+        'width': width,
+        'height': height,
+        'content_type': content_type[:100],
+        'failed': failed,
+        'checked_at': timezone.now(),
+    }
+    if len(url) > _URL_MAX_LENGTH:
+        probe = ImageProbe(url=url, **values)
+    else:
+        try:
+            probe, _ = ImageProbe.objects.update_or_create(url=url, defaults=values)
+        except IntegrityError:
+            # Another worker stored the same URL concurrently; theirs is just as fresh
+            probe = ImageProbe(url=url, **values)
+    _probes.set(url, probe)
+    return probe
+
+
+def clear_memory_cache():
+    _probes.clear()
@@ -0,0 +1,111 @@
+"""Read image dimensions from the first bytes of a file.
+
+PNG, GIF, JPEG and WebP all record width and height near the start of the
+file, so a probe only needs a few KB instead of the whole image.
+"""
+import struct
+from collections import namedtuple
+from io import BytesIO
+
+from PIL import Image
+
+
+ImageSize = namedtuple('ImageSize', ['width', 'height', 'content_type', 'bytes_read'])
+
+# JPEG start-of-frame markers carry the dimensions (C4, C8 and CC are not frames)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Standalone JPEG markers that have no length field after them
+_JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+
+def _png_size(data):
+    if len(data) < 24 or data[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', data[16:24])
+
+
+def _gif_size(data):
+    if len(data) < 10:
+        return None
+    return struct.unpack('<HH', data[6:10])
+
+
+def _webp_size(data):
+    if len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L':
+        bits = int.from_bytes(data[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+    return None
+
+
+def _jpeg_size(data):
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            i += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > len(data):
+                return None
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    return None
+
+
+def parse_image_size(data):
+    """Return (width, height, content_type) from an image's leading bytes, or None.
+
+    None means the format is unknown or `data` stops before the dimensions.
+    """
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        size, content_type = _png_size(data), 'image/png'
+    elif data[:6] in (b'GIF87a', b'GIF89a'):
+        size, content_type = _gif_size(data), 'image/gif'
+    elif data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        size, content_type = _webp_size(data), 'image/webp'
+    elif data.startswith(b'\xff\xd8'):
+        size, content_type = _jpeg_size(data), 'image/jpeg'
+    else:
+        return None
+    if not size or not all(size):
+        return None
+    return size[0], size[1], content_type
+
+
+def read_image_size(response, header_bytes, chunk_size=4096):
+    """Read dimensions from a streamed `requests` response.
+
+    Reads at most `header_bytes` looking for the dimensions in the file header
+    and only falls back to downloading and decoding the whole image with PIL
+    when the header can't be parsed. A `header_bytes` of 0 always does the
+    full download.
+    """
+    data = b''
+    chunks = response.iter_content(chunk_size=chunk_size)
+    if header_bytes:
+        for chunk in chunks:
+            data += chunk
+            parsed = parse_image_size(data)
+            if parsed:
+                return ImageSize(*parsed, bytes_read=len(data))
+            if len(data) >= header_bytes:
+                break
+    data += b''.join(chunks)
+    img = Image.open(BytesIO(data))
+    width, height = img.size
+    content_type = Image.MIME.get(img.format) or response.headers.get('Content-Type', '')
+    return ImageSize(width, height, content_type, bytes_read=len(data))
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.partitions import INTERVALS, convert_to_partitioned, create_partitions, is_partitioned
+
+
+class Command(BaseCommand):
+    help = "Create upcoming pub_date partitions of the content table (PostgreSQL only)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert', action='store_true',
+            help="partition the content table first; its current rows become the default partition",
+        )
+        parser.add_argument('--interval', choices=INTERVALS, help="defaults to CONTENT_PARTITION_INTERVAL")
+        parser.add_argument('--ahead', type=int, help="future periods to create, defaults to CONTENT_PARTITIONS_AHEAD")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Content partitioning needs PostgreSQL.")
+        interval = options['interval'] or settings.CONTENT_PARTITION_INTERVAL
+
+        created = []
+        if not is_partitioned():
+            if not options['convert']:
+                raise CommandError("The content table isn't partitioned yet, run again with --convert.")
+            created += convert_to_partitioned(interval)
+            self.stdout.write(f"Partitioned the content table by {interval}")
+        created += create_partitions(options['ahead'], interval)
+
+        for name in created:
+            self.stdout.write(f"Created partition {name}")
+        self.stdout.write(self.style.SUCCESS(f"{len(created)} partitions created"))
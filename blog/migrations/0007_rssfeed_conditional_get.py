@@ -0,0 +1,33 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_add_index_guid_link'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rssfeed',
+            name='cache_hits',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='cache_misses',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='etag',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='last_modified',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
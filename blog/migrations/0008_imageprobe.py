@@ -0,0 +1,29 @@
+# Generated by Django 4.2.4 on 2026-10-17 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_rssfeed_conditional_get'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageProbe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2000, unique=True)),
+                ('width', models.PositiveIntegerField(default=0)),
+                ('height', models.PositiveIntegerField(default=0)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('failed', models.BooleanField(default=False)),
+                ('checked_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Image Probe',
+                'verbose_name_plural': 'Image Probes',
+            },
+        ),
+    ]
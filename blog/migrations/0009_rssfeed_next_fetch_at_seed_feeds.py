@@ -0,0 +1,183 @@
+# Seeds RSSFeed with the feed lists that used to be hardcoded in blog/tasks.py,
+# so ingestion can be driven entirely from the table.
+
+from urllib.parse import urlparse
+
+from django.db import migrations, models
+
+
+SEED_FEEDS = {
+    'crypto': [
+        "https://cointelegraph.com/rss",
+        "https://bitcoinmagazine.com/.rss/full/",
+        "https://cryptopotato.com/feed/",
+        "https://crypto.news/feed/",
+        "https://decrypt.co/feed",
+        "https://www.coindesk.com/arc/outboundfeeds/rss/",
+        "https://thedefiant.io/feed/",
+        "https://blockworks.co/feed/",
+    ],
+    'jobs': [
+        "https://weworkremotely.com/categories/remote-back-end-programming-jobs.rss",
+        "https://weworkremotely.com/categories/remote-full-stack-programming-jobs.rss",
+        "https://weworkremotely.com/remote-jobs.rss",
+        "https://techcrunch.com/category/startups/feed/",
+        "https://news.crunchbase.com/feed/",
+        "https://stackoverflow.blog/feed/",
+        "https://www.jobbio.com/feed/",
+        "https://blog.hired.com/feed/",
+    ],
+    'cybersecurity': [
+        "https://feeds.feedburner.com/TheHackersNews",
+        "https://www.darkreading.com/rss_simple.asp",
+        "https://krebsonsecurity.com/feed/",
+        "https://www.cyberscoop.com/feed/",
+        "https://www.helpnetsecurity.com/feed/",
+        "https://securityaffairs.co/feed",
+        "https://securelist.com/feed/",
+        "https://securityintelligence.com/feed/",
+        "https://www.bleepingcomputer.com/feed/",
+        "https://portswigger.net/daily-swig/rss",
+        "https://www.recordedfuture.com/feed",
+    ],
+    'python': [
+        "https://realpython.com/atom.xml?format=xml",
+        "https://planetpython.org/rss20.xml",
+        "https://blog.python.org/feeds/posts/default",
+        "https://talkpython.fm/episodes/rss",
+        "https://blog.jetbrains.com/pycharm/feed/",
+        "https://devblogs.microsoft.com/python/feed/",
+        "https://www.fullstackpython.com/feeds/all.atom.xml",
+        "https://pythonbytes.fm/episodes/rss",
+        "https://blog.miguelgrinberg.com/feed",
+    ],
+    'software_dev': [
+        "https://news.ycombinator.com/rss",
+        "https://feed.infoq.com/",
+        "https://martinfowler.com/feed.atom",
+        "https://sdtimes.com/feed/",
+        "https://www.developer-tech.com/feed",
+        "https://blog.codinghorror.com/rss/",
+        "https://www.joelonsoftware.com/feed/",
+        "https://dev.to/feed",
+        "https://github.blog/feed/",
+        "https://engineering.fb.com/feed/",
+        "https://netflixtechblog.com/feed",
+    ],
+    'ui_ux': [
+        "https://uxdesign.cc/feed",
+        "https://uxplanet.org/feed",
+        "https://www.smashingmagazine.com/feed/",
+        "https://www.nngroup.com/feed/rss/",
+        "https://usabilitygeek.com/feed/",
+        "https://uxmastery.com/feed/",
+        "https://www.invisionapp.com/inside-design/feed",
+        "https://www.figma.com/blog/rss.xml",
+        "https://alistapart.com/main/feed/",
+        "https://css-tricks.com/feed/",
+    ],
+    'mobile_pc': [
+        "https://www.androidcentral.com/feed",
+        "https://9to5mac.com/feed/",
+        "https://9to5google.com/feed/",
+        "https://www.androidpolice.com/feed/",
+        "https://www.xda-developers.com/feed/",
+        "https://www.macrumors.com/macrumors.xml",
+        "https://www.theverge.com/mobile/rss/index.xml",
+        "https://www.pcworld.com/feed",
+        "https://www.tomshardware.com/feeds/all",
+    ],
+    'general': [
+        "https://techcrunch.com/feed/",
+        "https://arstechnica.com/feed/",
+        "https://www.wired.com/feed/rss/",
+        "https://www.theverge.com/rss/index.xml",
+        "https://thenextweb.com/feed/",
+        "https://www.engadget.com/rss.xml",
+        "https://gizmodo.com/rss",
+        "https://www.techmeme.com/feed.xml",
+        "https://mashable.com/feeds/rss/all",
+    ],
+    'ai': [
+        "https://www.zdnet.com/topic/artificial-intelligence/rss.xml",
+        "https://www.technologyreview.com/feed/",
+        "https://syncedreview.com/category/ai/feed/",
+        "https://www.kdnuggets.com/feed/rss2",
+        "https://www.aitrends.com/feed/",
+        "https://www.analyticsinsight.net/category/artificial-intelligence/feed/",
+        "https://machinelearningmastery.com/feed/",
+        "https://openai.com/blog/rss/",
+        "https://blogs.nvidia.com/feed/",
+        "https://ai.googleblog.com/feeds/posts/default",
+        "https://aws.amazon.com/blogs/machine-learning/feed/",
+        "https://www.marktechpost.com/feed/",
+        "https://towardsdatascience.com/feed/",
+    ],
+    'medical_news': [
+        "https://www.sciencedaily.com/rss/health_medicine/diseases_and_conditions.xml",
+        "https://www.medicalnewstoday.com/rss",
+        "https://www.healthline.com/rss",
+        "https://www.medscape.com/rss/public/medscapewire",
+        "https://www.healio.com/rss/specialty",
+        "https://www.fiercepharma.com/rss/xml",
+        "https://www.statnews.com/feed/",
+    ],
+    'ai_medical_imaging': [
+        "https://www.rsna.org/rss/press-releases",
+        "https://pubs.rsna.org/action/showFeed?type=etoc&feed=rss&jc=radiol",
+        "https://www.nature.com/npjdigitalmed.rss",
+        "https://blogs.nvidia.com/blog/category/healthcare/feed/",
+        "https://www.sciencedaily.com/rss/computers_math/artificial_intelligence.xml",
+        "https://www.medicaldevice-network.com/feed/",
+    ],
+}
+
+
+def seed_feeds(apps, schema_editor):
+    RSSFeed = apps.get_model('blog', 'RSSFeed')
+    for category, urls in SEED_FEEDS.items():
+        for url in urls:
+            RSSFeed.objects.get_or_create(
+                url=url,
+                defaults={'name': urlparse(url).hostname, 'category': category},
+            )
+
+
+LEGACY_TASKS = [
+    'blog.tasks.fetch_crypto_content',
+    'blog.tasks.fetch_tech_jobs',
+    'blog.tasks.fetch_cyber_content',
+    'blog.tasks.fetch_python_content',
+    'blog.tasks.fetch_sd_content',
+    'blog.tasks.fetch_ui_ux_content',
+    'blog.tasks.fetch_mobile_pc_content',
+    'blog.tasks.fetch_general_content',
+    'blog.tasks.fetch_ai_content',
+    'blog.tasks.fetch_medical_news',
+    'blog.tasks.fetch_ai_medical_imaging',
+]
+
+
+def disable_legacy_beat_entries(apps, schema_editor):
+    # The DatabaseScheduler keeps entries synced from the old CELERY_BEAT_SCHEDULE;
+    # left enabled they would fetch every feed again alongside schedule_feeds.
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    PeriodicTask.objects.filter(task__in=LEGACY_TASKS).update(enabled=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_imageprobe'),
+        ('django_celery_beat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rssfeed',
+            name='next_fetch_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(seed_feeds, migrations.RunPython.noop),
+        migrations.RunPython(disable_legacy_beat_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_rssfeed_next_fetch_at_seed_feeds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rssfeed',
+            name='poll_interval',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='rssfeed',
+            name='update_interval',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_rssfeed_adaptive_polling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rssfeed',
+            name='failure_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_rssfeed_failure_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_model', models.CharField(max_length=100)),
+                ('simhash', models.BigIntegerField()),
+                ('band_0', models.PositiveIntegerField(db_index=True)),
+                ('band_1', models.PositiveIntegerField(db_index=True)),
+                ('band_2', models.PositiveIntegerField(db_index=True)),
+                ('band_3', models.PositiveIntegerField(db_index=True)),
+                ('pub_date', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Content Fingerprint',
+                'verbose_name_plural': 'Content Fingerprints',
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:21
+
+from django.db import migrations, models
+
+from blog.normalize import canonicalize_url, identity_hash
+
+
+CONTENT_MODELS = [
+    'aicontent', 'aimedicalimagingcontent', 'cryptocontent', 'cybersecuritycontent',
+    'generalcontent', 'jobupdatescontent', 'medicalnewscontent', 'mobilepccontent',
+    'pythoncontent', 'softwaredevelopmentcontent', 'uiuxcontent',
+]
+
+
+def backfill_hashes(apps, schema_editor):
+    """Hash existing GUIDs and links; later duplicates keep a NULL hash so the unique indexes can be built."""
+    for model_name in CONTENT_MODELS:
+        Content = apps.get_model('blog', model_name)
+        seen_guids, seen_links, batch = set(), set(), []
+        for row in Content.objects.order_by('pk').only('pk', 'guid', 'link').iterator(chunk_size=2000):
+            guid_hash = identity_hash(row.guid.strip())
+            link_hash = identity_hash(canonicalize_url(row.link))
+            row.guid_hash = guid_hash if guid_hash not in seen_guids else None
+            row.link_hash = link_hash if link_hash not in seen_links else None
+            seen_guids.add(guid_hash)
+            seen_links.add(link_hash)
+            batch.append(row)
+            if len(batch) >= 2000:
+                Content.objects.bulk_update(batch, ['guid_hash', 'link_hash'])
+                batch = []
+        Content.objects.bulk_update(batch, ['guid_hash', 'link_hash'])
+
+
+def hash_fields(unique):
+    return [
+        (model_name, name, models.BigIntegerField(blank=True, editable=False, null=True, unique=unique))
+        for model_name in CONTENT_MODELS
+        for name in ('guid_hash', 'link_hash')
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_contentfingerprint'),
+    ]
+
+    operations = [
+        *[
+            migrations.AddField(model_name=model_name, name=name, field=field)
+            for model_name, name, field in hash_fields(unique=False)
+        ],
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+        *[
+            migrations.AlterField(model_name=model_name, name=name, field=field)
+            for model_name, name, field in hash_fields(unique=True)
+        ],
+        # Dedup goes through the hashes now, so the long string indexes only cost writes
+        *[
+            migrations.AlterField(model_name=model_name, name='guid', field=models.CharField(max_length=1000))
+            for model_name in CONTENT_MODELS
+        ],
+        *[
+            migrations.AlterField(model_name=model_name, name='link', field=models.URLField(max_length=2000))
+            for model_name in CONTENT_MODELS
+        ],
+    ]
@@ -0,0 +1,139 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Old per-category table -> Content.category
+CONTENT_MODELS = {
+    'aicontent': 'ai',
+    'aimedicalimagingcontent': 'ai_medical_imaging',
+    'cryptocontent': 'crypto',
+    'cybersecuritycontent': 'cybersecurity',
+    'generalcontent': 'general',
+    'jobupdatescontent': 'jobs',
+    'medicalnewscontent': 'medical_news',
+    'mobilepccontent': 'mobile_pc',
+    'pythoncontent': 'python',
+    'softwaredevelopmentcontent': 'software_dev',
+    'uiuxcontent': 'ui_ux',
+}
+
+PROXY_MODELS = [
+    'AIContent', 'AIMedicalImagingContent', 'CryptoContent', 'CyberSecurityContent', 'GeneralContent',
+    'JobUpdatesContent', 'MedicalNewsContent', 'MobilePcContent', 'PythonContent',
+    'SoftwareDevelopmentContent', 'UiUxContent',
+]
+
+COPIED_FIELDS = [
+    'title', 'description', 'pub_date', 'link', 'content_name', 'guid',
+    'guid_hash', 'link_hash', 'image', 'source_feed_id',
+]
+
+
+def copy_table(apps, schema_editor, OldContent, category, batch_size=2000):
+    """Copy one per-category table into blog.Content and point its bookmarks at the new rows."""
+    Content = apps.get_model('blog', 'Content')
+    UserBookmark = apps.get_model('blog', 'UserBookmark')
+    returns_ids = schema_editor.connection.features.can_return_rows_from_bulk_insert
+    new_ids = {}
+    rows = OldContent.objects.order_by('pk').values('pk', *COPIED_FIELDS).iterator(chunk_size=batch_size)
+    while True:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            break
+        contents = [Content(category=category, **{name: row[name] for name in COPIED_FIELDS}) for row in batch]
+        if returns_ids:
+            Content.objects.bulk_create(contents)
+        else:
+            for content in contents:
+                content.save()
+        new_ids.update((row['pk'], content.pk) for row, content in zip(batch, contents))
+
+    # Bookmarks refer to content by (category, id) without a foreign key. One whose id wasn't
+    # copied (its row was already deleted) would point at an unrelated row in the shared id
+    # space, so it goes; the rest follow their rows to the new ids.
+    bookmarks = list(UserBookmark.objects.filter(content_type=category).only('pk', 'content_id'))
+    stale = [bookmark.pk for bookmark in bookmarks if bookmark.content_id not in new_ids]
+    bookmarks = [bookmark for bookmark in bookmarks if bookmark.content_id in new_ids]
+    for start in range(0, len(stale), batch_size):
+        UserBookmark.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+
+    # Park the moved bookmarks above every old and new id first, so no single row update
+    # can clash with a (user, content_type, content_id) that hasn't moved yet
+    offset = max([*new_ids, *new_ids.values()], default=0) + 1
+    for start in range(0, len(bookmarks), batch_size):
+        pks = [bookmark.pk for bookmark in bookmarks[start:start + batch_size]]
+        UserBookmark.objects.filter(pk__in=pks).update(content_id=models.F('content_id') + offset)
+    for bookmark in bookmarks:
+        bookmark.content_id = new_ids[bookmark.content_id]
+    UserBookmark.objects.bulk_update(bookmarks, ['content_id'], batch_size=batch_size)
+
+
+def copy_contents(apps, schema_editor):
+    for model_name, category in CONTENT_MODELS.items():
+        copy_table(apps, schema_editor, apps.get_model('blog', model_name), category)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_hashed_identity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Content',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('pub_date', models.DateTimeField()),
+                ('link', models.URLField(max_length=2000)),
+                ('content_name', models.CharField(max_length=255)),
+                ('guid', models.CharField(max_length=1000)),
+                ('guid_hash', models.BigIntegerField(blank=True, editable=False, null=True)),
+                ('link_hash', models.BigIntegerField(blank=True, editable=False, null=True)),
+                ('image', models.URLField(max_length=2000, null=True)),
+                ('category', models.CharField(choices=[('general', 'General Tech'), ('python', 'Python'), ('cybersecurity', 'Cyber Security'), ('software_dev', 'Software Development'), ('ui_ux', 'UI/UX'), ('mobile_pc', 'Mobile & PC'), ('jobs', 'Job Updates'), ('crypto', 'Crypto'), ('ai', 'Artificial Intelligence'), ('medical_news', 'Medical News'), ('ai_medical_imaging', 'AI in Medical Imaging'), ('medical_imaging', 'Medical Imaging')], max_length=50)),
+                ('source_feed', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.rssfeed')),
+            ],
+            options={
+                'verbose_name': 'Content',
+                'verbose_name_plural': 'Contents',
+                'ordering': ['-pub_date'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['category', '-pub_date'], name='blog_content_category_pub'),
+        ),
+        migrations.AddConstraint(
+            model_name='content',
+            constraint=models.UniqueConstraint(fields=('guid_hash', 'category'), name='blog_content_unique_guid'),
+        ),
+        migrations.AddConstraint(
+            model_name='content',
+            constraint=models.UniqueConstraint(fields=('link_hash', 'category'), name='blog_content_unique_link'),
+        ),
+        migrations.RunPython(copy_contents, migrations.RunPython.noop),
+        *[
+            migrations.RemoveField(model_name=model_name, name='source_feed')
+            for model_name in CONTENT_MODELS
+        ],
+        *[migrations.DeleteModel(name=name) for name in PROXY_MODELS],
+        *[
+            migrations.CreateModel(
+                name=name,
+                fields=[],
+                options={
+                    'proxy': True,
+                    'indexes': [],
+                    'constraints': [],
+                },
+                bases=('blog.content',),
+            )
+            for name in PROXY_MODELS
+        ],
+    ]
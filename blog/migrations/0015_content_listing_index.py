@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_content_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(condition=models.Q(('image__isnull', False)), fields=['category', '-pub_date'], name='blog_content_listing'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_content_listing_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='content',
+            name='blog_content_category_pub',
+        ),
+        migrations.RemoveIndex(
+            model_name='content',
+            name='blog_content_listing',
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['category', '-pub_date', '-id'], name='blog_content_category_pub'),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(condition=models.Q(('image__isnull', False)), fields=['category', '-pub_date', '-id'], name='blog_content_listing'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Site Stat',
+                'verbose_name_plural': 'Site Stats',
+            },
+        ),
+    ]
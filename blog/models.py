@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import connections, models
+from django.db.models.constants import OnConflict
+
+from .normalize import canonicalize_url, identity_hash
 
 
 class RSSFeed(models.Model):
@@ -27,6 +31,18 @@ class RSSFeed(models.Model):
     fetch_error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # HTTP validators from the last full download, replayed as a conditional GET
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    cache_hits = models.PositiveIntegerField(default=0)  # 304 Not Modified responses
+    cache_misses = models.PositiveIntegerField(default=0)  # full 200 downloads
+    next_fetch_at = models.DateTimeField(null=True, blank=True, db_index=True)  # null = due now
+
+    # Adaptive polling, see adapt_poll_interval()
+    poll_interval = models.PositiveIntegerField(null=True, blank=True)  # seconds; null = FEED_POLL_INTERVAL
+    update_interval = models.FloatField(null=True, blank=True)  # observed seconds between new entries
+    failure_count = models.PositiveIntegerField(default=0)  # consecutive failed fetches
+
     class Meta:
         verbose_name = 'RSS Feed'
         verbose_name_plural = 'RSS Feeds'
@@ -35,6 +51,57 @@ class RSSFeed(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
 
+    @property
+    def content_model(self):
+        """The category proxy of `Content` this feed's entries are stored through."""
+        return CATEGORY_CONTENT_MODELS[self.category]
+
+    @property
+    def cache_hit_ratio(self):
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else 0.0
+
+    @property
+    def current_poll_interval(self):
+        return self.poll_interval or settings.FEED_POLL_INTERVAL
+
+    def adapt_poll_interval(self, new_items, now):
+        """Work out how long to wait before the next fetch, given what this one found.
+
+        Returns `(poll_interval, update_interval)`. `update_interval` is a moving
+        average of the time between new entries and the feed is polled about that
+        often; each fetch that finds nothing new backs off by FEED_POLL_BACKOFF.
+        The result is kept within FEED_POLL_MIN_INTERVAL..FEED_POLL_MAX_INTERVAL.
+        """
+        update_interval = self.update_interval
+        if new_items and self.last_fetched:
+            observed = max((now - self.last_fetched).total_seconds(), 0) / new_items
+            if update_interval is None:
+                update_interval = observed
+            else:
+                weight = settings.FEED_POLL_SMOOTHING
+                update_interval = weight * observed + (1 - weight) * update_interval
+            interval = update_interval
+        elif new_items:
+            interval = self.current_poll_interval
+        else:
+            interval = self.current_poll_interval * settings.FEED_POLL_BACKOFF
+        interval = min(max(interval, settings.FEED_POLL_MIN_INTERVAL), settings.FEED_POLL_MAX_INTERVAL)
+        return int(interval), update_interval
+
+    def failure_cooldown(self, failures):
+        """Seconds to wait after `failures` consecutive failed fetches: the poll interval, doubled per failure."""
+        return min(self.current_poll_interval * 2 ** (failures - 1), settings.FEED_BREAKER_MAX_COOLDOWN)
+
+    def conditional_headers(self):
+        """Request headers that let the server answer 304 if the feed is unchanged."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
 
 class UserBookmark(models.Model):
     """Reading list/bookmarks feature for saving articles"""
@@ -57,14 +124,74 @@ class UserBookmark(models.Model):
         return f"{self.user.username}: {self.title[:50]}"
 
 
+class SiteStat(models.Model):
+    """A materialised counter shown on the admin dashboard, see `blog.stats`."""
+
+    name = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Site Stat'
+        verbose_name_plural = 'Site Stats'
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class ImageProbe(models.Model):
+    """Cached result of inspecting a remote image, so repeat checks skip the network."""
+
+    url = models.URLField(max_length=2000, unique=True)
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    content_type = models.CharField(max_length=100, blank=True)
+    failed = models.BooleanField(default=False)  # unreachable, unsafe or not an image
+    checked_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Image Probe'
+        verbose_name_plural = 'Image Probes'
+
+    def __str__(self):
+        return f"{self.url} ({'failed' if self.failed else f'{self.width}x{self.height}'})"
+
+
+class ContentFingerprint(models.Model):
+    """SimHash of a stored entry's title and description, for near-duplicate lookups.
+
+    One table covers every content category so the same story arriving through
+    different feeds is caught. The fingerprint is also stored as four 16-bit
+    bands; see `blog.simhash`.
+    """
+
+    content_model = models.CharField(max_length=100)  # model_name of the table the entry went to
+    simhash = models.BigIntegerField()  # stored signed, see blog.simhash.to_signed
+    band_0 = models.PositiveIntegerField(db_index=True)
+    band_1 = models.PositiveIntegerField(db_index=True)
+    band_2 = models.PositiveIntegerField(db_index=True)
+    band_3 = models.PositiveIntegerField(db_index=True)
+    pub_date = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'Content Fingerprint'
+        verbose_name_plural = 'Content Fingerprints'
+
+    def __str__(self):
+        return f"{self.content_model}: {self.simhash:#x}"
+
+
 # Create your models here.
 class BaseModel(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     pub_date = models.DateTimeField()
-    link = models.URLField(max_length=2000, db_index=True)
+    link = models.URLField(max_length=2000)
     content_name = models.CharField(max_length=255)
-    guid = models.CharField(max_length=1000, db_index=True)
+    guid = models.CharField(max_length=1000)
+    # 64-bit hashes of the GUID and canonical link; dedup looks entries up by these
+    guid_hash = models.BigIntegerField(null=True, blank=True, editable=False)
+    link_hash = models.BigIntegerField(null=True, blank=True, editable=False)
     image = models.URLField(null=True, max_length=2000)
     source_feed = models.ForeignKey(
         RSSFeed, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
@@ -77,45 +204,165 @@ class BaseModel(models.Model):
     def __str__(self) -> str:
         return f"{self.content_name}: {self.title}"
 
+    def save(self, *args, **kwargs):
+        self.guid_hash = identity_hash(self.guid.strip())
+        self.link_hash = identity_hash(canonicalize_url(self.link))
+        super().save(*args, **kwargs)
+
+
+class ContentManager(models.Manager):
+    """Limits a category proxy of `Content` to the rows of its category."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        category = self.model.content_category
+        return queryset if category is None else queryset.filter(category=category)
+
+    def insert_new(self, objs):
+        """Bulk-insert `objs`, skipping those that clash with a unique constraint.
+
+        Unlike `bulk_create(ignore_conflicts=True)`, reports which rows went
+        in: returns the `(category, guid_hash, link_hash)` of each, from
+        ``INSERT ... ON CONFLICT DO NOTHING RETURNING``.
+        """
+        opts = self.model._meta.concrete_model._meta
+        fields = [field for field in opts.concrete_fields if field is not opts.auto_field]
+        returning = [opts.get_field(name) for name in ('category', 'guid_hash', 'link_hash')]
+        batch_size = max(connections[self.db].ops.bulk_batch_size(fields, objs), 1)
+        inserted = []
+        for start in range(0, len(objs), batch_size):
+            rows = self.get_queryset()._insert(
+                objs[start:start + batch_size], fields=fields, returning_fields=returning, on_conflict=OnConflict.IGNORE,
+            )
+            # A lone skipped row comes back as None
+            inserted.extend(tuple(row) for row in rows if row)
+        return inserted
 
-class GeneralContent(BaseModel):
-    pass
 
+class Content(BaseModel):
+    """Every stored feed entry, whatever its category.
 
-class PythonContent(BaseModel):
-    pass
+    Each category is also exposed as a proxy model (`GeneralContent`,
+    `PythonContent`, ...) whose manager only sees that category's rows and
+    whose saves fill in `category`, so per-category code keeps working while
+    cross-category queries go through `Content` directly.
+    """
 
+    CATEGORY_CHOICES = RSSFeed.CATEGORY_CHOICES + [('medical_imaging', 'Medical Imaging')]
 
-class SoftwareDevelopmentContent(BaseModel):
-    pass
+    category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
+
+    objects = ContentManager()
+
+    content_category = None  # set by each category proxy
+
+    class Meta(BaseModel.Meta):
+        abstract = False
+        verbose_name = 'Content'
+        verbose_name_plural = 'Contents'
+        indexes = [
+            # id breaks pub_date ties for keyset pagination (blog.pagination)
+            models.Index(fields=['category', '-pub_date', '-id'], name='blog_content_category_pub'),
+            # Category pages only list entries with an image, newest first (HomePageView)
+            models.Index(
+                fields=['category', '-pub_date', '-id'], condition=models.Q(image__isnull=False),
+                name='blog_content_listing',
+            ),
+        ]
+        constraints = [
+            # Hash first, so dedup can look hashes up across every category at once
+            models.UniqueConstraint(fields=['guid_hash', 'category'], name='blog_content_unique_guid'),
+            models.UniqueConstraint(fields=['link_hash', 'category'], name='blog_content_unique_link'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.content_category:
+            self.category = self.content_category
+        super().save(*args, **kwargs)
+
+
+class GeneralContent(Content):
+    content_category = 'general'
+
+    class Meta:
+        proxy = True
+
+
+class PythonContent(Content):
+    content_category = 'python'
+
+    class Meta:
+        proxy = True
+
+
+class SoftwareDevelopmentContent(Content):
+    content_category = 'software_dev'
+
+    class Meta:
+        proxy = True
+
+
+class CyberSecurityContent(Content):
+    content_category = 'cybersecurity'
+
+    class Meta:
+        proxy = True
 
 
-class CyberSecurityContent(BaseModel):
-    pass
+class UiUxContent(Content):
+    content_category = 'ui_ux'
+
+    class Meta:
+        proxy = True
+
+
+class MobilePcContent(Content):
+    content_category = 'mobile_pc'
+
+    class Meta:
+        proxy = True
+
+
+class JobUpdatesContent(Content):
+    content_category = 'jobs'
+
+    class Meta:
+        proxy = True
 
 
-class UiUxContent(BaseModel):
-    pass
+class CryptoContent(Content):
+    content_category = 'crypto'
+
+    class Meta:
+        proxy = True
 
 
-class MobilePcContent(BaseModel):
-    pass
+class AIContent(Content):
+    content_category = 'ai'
 
+    class Meta:
+        proxy = True
 
-class JobUpdatesContent(BaseModel):
-    pass
 
-class CryptoContent(BaseModel):
-    pass
+class MedicalNewsContent(Content):
+    content_category = 'medical_news'
 
+    class Meta:
+        proxy = True
 
-class AIContent(BaseModel):
-    pass
 
+class AIMedicalImagingContent(Content):
+    content_category = 'ai_medical_imaging'
 
-class MedicalNewsContent(BaseModel):
-    pass
+    class Meta:
+        proxy = True
 
 
-class AIMedicalImagingContent(BaseModel):
-    pass
+# Maps RSSFeed.category to the proxy its entries are stored through
+CATEGORY_CONTENT_MODELS = {
+    model.content_category: model
+    for model in (
+        GeneralContent, PythonContent, CyberSecurityContent, SoftwareDevelopmentContent, UiUxContent,
+        MobilePcContent, JobUpdatesContent, CryptoContent, AIContent, MedicalNewsContent, AIMedicalImagingContent,
+    )
+}
@@ -0,0 +1,207 @@
+"""Turn raw feed payloads into compact entry records.
+
+Everything here is plain Python with no Django imports, so it can run in a
+separate process: `parse_and_normalize` takes the downloaded bytes and
+returns picklable `EntryRecord` tuples for the parent to store.
+"""
+import hashlib
+import html
+import io
+import re
+from collections import namedtuple
+from urllib.parse import urlsplit, urlunsplit
+
+import feedparser
+from dateutil import parser
+
+from .simhash import simhash
+
+
+CLEANR = re.compile('<.*?>')
+
+def cleanhtml(raw_html):
+    cleantext = re.sub(CLEANR, '', raw_html)
+    return cleantext
+
+
+def extract_images_from_html(html_content):
+    """Extract image URLs from HTML content."""
+    if not html_content:
+        return []
+    # Find all img src attributes
+    img_pattern = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
+    return img_pattern.findall(html_content)
+
+# Priority order: full-size images first, thumbnails last
+IMAGE_FIELDS = ["media_content", "enclosures", "links", "media_group", "image", "media_thumbnail", "thumbnail"]
+HTML_IMAGE_FIELDS = ['content', 'summary', 'description']
+# Skip tiny icons and tracking pixels found in HTML content
+HTML_IMAGE_SKIP = ['icon', 'logo', 'badge', 'button', 'tracking', '1x1']
+
+
+def gather_image_candidates(item):
+    """Collect candidate image URLs from an RSS feed item, in priority order.
+
+    Returns `(media, inline)`: `media` holds `(url, declared_width)` pairs from
+    the media fields, where `declared_width` is the width advertised by the
+    feed (0 if none) or None for single-image fields that are always checked;
+    `inline` holds URLs of `<img>` tags found in the HTML content.
+    """
+    media = []
+    for field in IMAGE_FIELDS:
+        if not hasattr(item, field):
+            continue
+
+        value = getattr(item, field)
+        if not value:
+            continue
+
+        # Handle list of media items
+        if isinstance(value, list):
+            for media_item in value:
+                if not isinstance(media_item, dict):
+                    continue
+
+                url = media_item.get("url")
+                if not url:
+                    continue
+
+                # Skip non-image content types
+                media_type = media_item.get("type", "")
+                if media_type and not media_type.startswith("image"):
+                    continue
+
+                width = 0
+                if "width" in media_item:
+                    try:
+                        width = int(media_item["width"])
+                    except (ValueError, TypeError):
+                        pass
+                media.append((url, width))
+
+        # Handle single dict value
+        elif isinstance(value, dict) and "url" in value:
+            media.append((value["url"], None))
+
+    inline = []
+    for field in HTML_IMAGE_FIELDS:
+        content = item.get(field, '')
+        if isinstance(content, list) and content:
+            content = content[0].get('value', '') if isinstance(content[0], dict) else str(content[0])
+
+        if content:
+            for url in extract_images_from_html(content)[:3]:  # Check first 3 images only
+                if not any(skip in url.lower() for skip in HTML_IMAGE_SKIP):
+                    inline.append(url)
+
+    return media, inline
+
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_hsenc', '_hsmi', 'mkt_tok', 'ref_src', 'ref_url', 'cmpid', 'ncid', 'sr_share',
+}
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _is_tracking_param(key):
+    return key.startswith('utm_') or key in TRACKING_PARAMS
+
+
+def canonicalize_url(url):
+    """Normalise a link so trivially different copies of it compare equal.
+
+    Lower-cases the scheme and host, drops default ports, fragments, `utm_*`
+    and other tracking parameters, and sorts the remaining query parameters.
+    Anything that doesn't parse as a URL is returned stripped but unchanged.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.hostname:
+        return url
+
+    scheme = parts.scheme.lower()
+    netloc = parts.hostname.lower()
+    if ':' in netloc:
+        netloc = f'[{netloc}]'  # IPv6 literal
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+    if parts.username:
+        netloc = f'{parts.username}{":" + parts.password if parts.password else ""}@{netloc}'
+
+    # Parameters are filtered as raw `key=value` strings so their encoding is kept
+    query = sorted(
+        param for param in parts.query.split('&')
+        if param and not _is_tracking_param(param.split('=', 1)[0].lower())
+    )
+    return urlunsplit((scheme, netloc, parts.path or '/', '&'.join(query), ''))
+
+
+def identity_hash(value):
+    """64-bit hash of a GUID or canonical link, signed to fit a BigIntegerField; None if empty."""
+    if not value:
+        return None
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+# One normalised feed item; what a parser process sends back to the parent
+EntryRecord = namedtuple('EntryRecord', [
+    'content_name', 'guid', 'link', 'pub_date', 'title', 'description', 'media', 'inline', 'simhash',
+    'guid_hash', 'link_hash',
+])
+
+# Enough of the description to tell articles apart without hashing whole posts
+SIMHASH_TEXT_LENGTH = 2000
+
+
+def parse_document(content, url, headers=None):
+    """Parse a downloaded feed payload without letting feedparser touch the network."""
+    response_headers = dict(headers or {})
+    response_headers['content-location'] = url
+    return feedparser.parse(io.BytesIO(content), response_headers=response_headers)
+
+
+def normalize_items(feed, limits):
+    """Yield an `EntryRecord` for every usable item of a parsed feed.
+
+    `limits` maps the `content_name`, `guid`, `link` and `title` columns to
+    their max lengths. Items without a GUID or link, with identifiers too long
+    for their columns, or with unparseable dates are skipped.
+    """
+    try:
+        content_title = feed.channel.get('title', 'Technology')
+    except AttributeError:
+        content_title = "Technology"
+    content_title = content_title[:limits['content_name']]
+
+    tzinfos = {"PDT": -25200, "PST": -28800}  # PDT and PST offsets in seconds
+    for item in feed.entries:
+        try:
+            guid = item.get('guid', item.get('id', '')).strip()
+            link = canonicalize_url(item.get('link', item.get('url', '')))
+            if not (guid or link):
+                continue
+            if len(guid) > limits['guid'] or len(link) > limits['link']:
+                continue
+            pub_date = parser.parse(item.get('published', item.get('updated', '')), tzinfos=tzinfos)
+            description = html.unescape(cleanhtml(item.get('description', item.get('summary', ''))))
+            title = html.unescape(cleanhtml(item.get('title', item.get('name', ''))))
+            media, inline = gather_image_candidates(item)
+            fingerprint = simhash(f"{title} {description[:SIMHASH_TEXT_LENGTH]}")
+        except Exception as e:
+            print(f"An error occurred while saving the contents for {content_title}: {e}")
+            continue
+        yield EntryRecord(
+            content_title, guid, link, pub_date, title[:limits['title']], description, media, inline, fingerprint,
+            identity_hash(guid), identity_hash(link),
+        )
+
+
+def parse_and_normalize(content, url, headers, limits):
+    """Parse a feed payload and return its `EntryRecord`s; the process-pool entry point."""
+    return list(normalize_items(parse_document(content, url, headers), limits))
@@ -0,0 +1,113 @@
+"""Whole-page cache for anonymous visitors of content listings.
+
+Listing pages look the same to every anonymous visitor until their
+category's entries change, so the rendered response is cached under the
+request URL (page cursor included), the content versions of the categories
+shown (see `blog.versions`), the version of the sidebar's recent forum posts
+and the build (`build_id`). A cache hit skips the listing query, the context
+processors and template rendering. Signed-in users always get a fresh page,
+and a response is never cached if rendering it set a cookie or needed a CSRF
+token. Entries expire after `PAGE_CACHE_TIMEOUT` regardless.
+
+The same responses carry validators, so returning readers and feed crawlers
+get a bodiless 304 Not Modified, checked before the cache or the database is
+touched. The ETag is a hash of the cache key, so it changes exactly when the
+page's versions, URL or build do. Last-Modified is when the newest of those
+versions last moved. HTTP dates only have whole seconds, so it is only sent
+once that second is over, when no later change can share it.
+"""
+import functools
+import hashlib
+import math
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.utils import get_app_template_dirs
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from forum.context_processors import RECENT_POSTS_VERSION
+
+from .versions import get_versions
+
+
+def build_id():
+    """`BUILD_ID` if the deploy sets one, else a hash of every template, so a deploy that changes pages changes it."""
+    return settings.BUILD_ID or _templates_digest()
+
+
+@functools.lru_cache(maxsize=None)
+def _templates_digest():
+    digest = hashlib.md5()
+    directories = [Path(directory) for engine in settings.TEMPLATES for directory in engine.get('DIRS', [])]
+    for directory in [*directories, *get_app_template_dirs('templates')]:
+        for path in sorted(Path(directory).rglob('*')):
+            if path.is_file():
+                digest.update(str(path.relative_to(directory)).encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def page_cache_key(request, versions):
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    version = '.'.join(f'{category}-{versions[category]}' for category in sorted(versions))
+    return f'page:{build_id()}:{version}:{url}'
+
+
+def last_modified(changed):
+    """The HTTP Last-Modified for content that last `changed` then, or None while that second lasts."""
+    modified = math.ceil(changed)
+    return modified if time.time() >= modified else None
+
+
+class PageCacheMixin:
+    """Serves anonymous GET requests of a listing view from the page cache, with validators.
+
+    The page is keyed on the versions of `page_cache_categories`, which
+    defaults to the category of the view's model.
+    """
+
+    page_cache_categories = None
+
+    def get_page_cache_categories(self):
+        return self.page_cache_categories or [self.model.content_category]
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        versions, changed = get_versions(self.get_page_cache_categories() + [RECENT_POSTS_VERSION], with_changed=True)
+        key = page_cache_key(request, versions)
+        etag = f'"{hashlib.md5(key.encode()).hexdigest()}"'
+        modified = last_modified(changed)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=modified)
+        if not_modified is not None:
+            return self._set_validators(not_modified, etag, modified)
+
+        response = cache.get(key)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200 or not hasattr(response, 'add_post_render_callback'):
+                return response
+            response['ETag'] = etag
+            # Let browsers keep the page but check back every time, which is what the validators are for
+            patch_cache_control(response, no_cache=True)
+            response.add_post_render_callback(lambda rendered: self._store_page(request, key, rendered))
+        return self._set_validators(response, etag, modified)
+
+    def _set_validators(self, response, etag, modified):
+        # Last-Modified isn't cached with the page: the same page may only get one once its second is over
+        response['ETag'] = etag
+        if modified is None:
+            del response['Last-Modified']
+        else:
+            response['Last-Modified'] = http_date(modified)
+        return response
+
+    def _store_page(self, request, key, response):
+        # A CSRF token or cookie would be handed to every other visitor
+        if request.META.get('CSRF_COOKIE_NEEDS_UPDATE') or response.cookies:
+            return
+        cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
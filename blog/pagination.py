@@ -0,0 +1,169 @@
+"""Keyset (cursor) pagination for newest-first content listings.
+
+Django's `Paginator` pages with OFFSET and counts every matching row, so
+each page costs more the deeper it is. `KeysetPaginator` instead pages on
+(pub_date, id): the next page is "rows older than the last one shown",
+which the (category, pub_date) indexes answer directly, so page N costs the
+same single query as page 1 and nothing is counted unless asked for.
+
+Cursors are opaque tokens passed in the usual ``?page=`` parameter. Pages
+keep the `Page` API templates use (`has_next`, `next_page_number`, ...), with
+the "page numbers" being cursors; `page_range` is empty since a keyset can't
+jump to page N.
+"""
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.paginator import InvalidPage
+from django.db import connection
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(direction, item):
+    payload = json.dumps([direction, item.pub_date.isoformat(), item.pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, pub_date, pk) from a cursor made by `encode_cursor`."""
+    try:
+        direction, pub_date, pk = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        pub_date = parse_datetime(pub_date)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor("Invalid page cursor")
+    if direction not in ('next', 'previous') or pub_date is None or not isinstance(pk, int):
+        raise InvalidCursor("Invalid page cursor")
+    return direction, pub_date, pk
+
+
+def estimate_count(queryset):
+    """The planner's row estimate for `queryset` on PostgreSQL; an exact count elsewhere."""
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPage(Sequence):
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.number = None
+
+    def __repr__(self):
+        return f"<Keyset page of {len(self)} items>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    # Named like `Page`'s so templates linking ?page={{ page_obj.next_page_number }} keep working
+    def next_page_number(self):
+        return self.next_cursor
+
+    def previous_page_number(self):
+        return self.previous_cursor
+
+
+class KeysetPaginator:
+    """Pages through `queryset` newest first, `per_page` rows at a time.
+
+    `count` is exact by default; with `estimate_count` it is the database's
+    estimate, which costs no table scan on PostgreSQL.
+    """
+
+    page_range = range(0)
+
+    def __init__(self, queryset, per_page, estimate_count=False):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.estimate_count = estimate_count
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.queryset) if self.estimate_count else self.queryset.count()
+
+    @cached_property
+    def num_pages(self):
+        return max(1, -(-self.count // self.per_page))
+
+    def page_queryset(self, cursor=None):
+        """The query behind a page: one indexed range read of at most `per_page + 1` rows."""
+        position = self._position(cursor)
+        if position is None:
+            return self.queryset.order_by('-pub_date', '-pk')[:self.per_page + 1]
+        direction, pub_date, pk = position
+        # The plain range on pub_date is what lets the index seek straight to the cursor
+        if direction == 'next':
+            older = Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            return self.queryset.filter(older, pub_date__lte=pub_date).order_by('-pub_date', '-pk')[:self.per_page + 1]
+        newer = Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        return self.queryset.filter(newer, pub_date__gte=pub_date).order_by('pub_date', 'pk')[:self.per_page + 1]
+
+    def page(self, cursor=None):
+        """Return the page after (or, for a "previous" cursor, before) `cursor`; no cursor is the first page."""
+        position = self._position(cursor)
+        rows = list(self.page_queryset(cursor))
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if position is None:
+            has_next, has_previous = more, False
+        elif position[0] == 'next':
+            has_next, has_previous = more, True
+        else:
+            rows.reverse()
+            has_next, has_previous = True, more
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=encode_cursor('next', rows[-1]) if has_next and rows else None,
+            previous_cursor=encode_cursor('previous', rows[0]) if has_previous and rows else None,
+        )
+
+    @staticmethod
+    def _position(cursor):
+        # "1" is what links to the first page of a numbered paginator look like
+        if not cursor or cursor == '1':
+            return None
+        return decode_cursor(cursor)
+
+
+class KeysetPaginationMixin:
+    """`MultipleObjectMixin` pagination through `KeysetPaginator`.
+
+    Keeps the usual context (`paginator`, `page_obj`, `is_paginated` and the
+    object list), reading the cursor from the `page_kwarg` query parameter.
+    """
+
+    estimate_count = False
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, estimate_count=self.estimate_count)
+        cursor = self.kwargs.get(self.page_kwarg) or self.request.GET.get(self.page_kwarg)
+        try:
+            page = paginator.page(cursor)
+        except InvalidPage as e:
+            raise Http404(f"Invalid page: {e}")
+        return paginator, page, page.object_list, page.has_other_pages()
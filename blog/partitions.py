@@ -0,0 +1,236 @@
+"""Optional range partitioning of the content table on `pub_date` (PostgreSQL only).
+
+`convert_to_partitioned` turns `blog_content` into a table partitioned by
+week or month (`CONTENT_PARTITION_INTERVAL`). The rows already stored stay
+where they are, as the table's DEFAULT partition, while new entries go to
+per-period partitions that `create_partitions` sets up ahead of time. Newest
+first listings then only read the latest partitions, and retention drops a
+whole period with `drop_expired_partitions` once every category is done with
+it, leaving only the stragglers to `blog.retention.delete_in_batches`.
+Partitions that still hold rows retention doesn't manage (medical imaging
+entries added through the admin) are kept.
+
+A partition is detached before it is dropped, so the table only needs the
+detach's lock. PostgreSQL can't detach CONCURRENTLY while the table has a
+DEFAULT partition, which a converted table always has, so the detach takes a
+short exclusive lock, waiting at most `CONTENT_PARTITION_LOCK_TIMEOUT`
+seconds for it rather than queueing listing reads behind a long-running query.
+
+PostgreSQL wants the partition key in every unique index, so on a
+partitioned table the primary key becomes (id, pub_date) and the GUID and
+link hash constraints take pub_date as well. Duplicates are still caught by
+the hash lookup in `blog.utils.dedup_entries` before anything is written.
+
+Run ``python manage.py content_partitions --convert`` once; from then on
+`cleanup_old_content` keeps `CONTENT_PARTITIONS_AHEAD` periods ready.
+"""
+import re
+import time
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import OperationalError, connection, models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Content
+
+
+TABLE = Content._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+INTERVALS = ('week', 'month')
+DETACH_ATTEMPTS = 3
+
+_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+def is_partitioned():
+    """Whether the content table has been converted, which needs PostgreSQL."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def period_start(moment, interval):
+    """Start (UTC midnight) of the week or month `moment` falls in."""
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown partition interval {interval!r}, expected one of {INTERVALS}")
+    start = moment.astimezone(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == 'week':
+        return start - timedelta(days=start.weekday())
+    return start.replace(day=1)
+
+
+def next_period(start, interval):
+    if interval == 'week':
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(start, interval):
+    return f"{TABLE}_{start:%G_w%V}" if interval == 'week' else f"{TABLE}_{start:%Y_%m}"
+
+
+def list_partitions():
+    """(name, upper bound) of every period partition, oldest first; the default partition is left out."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound in rows:
+        match = _UPPER_BOUND.search(bound)
+        if match:
+            partitions.append((name, parse_datetime(match.group(1))))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partitions(ahead=None, interval=None, now=None):
+    """Create the partitions for the current period and `ahead` periods after it.
+
+    Rows of a period that are already in the default partition (entries
+    dated ahead, or the current period right after the conversion) are moved
+    into the new partition. Returns the names of the partitions created.
+    """
+    ahead = settings.CONTENT_PARTITIONS_AHEAD if ahead is None else ahead
+    interval = interval or settings.CONTENT_PARTITION_INTERVAL
+    existing = {name for name, _ in list_partitions()}
+    start = period_start(now or timezone.now(), interval)
+    created = []
+    for _ in range(ahead + 1):
+        end = next_period(start, interval)
+        name = partition_name(start, interval)
+        if name not in existing:
+            _create_partition(name, start, end)
+            created.append(name)
+        start = end
+    return created
+
+
+def _create_partition(name, start, end):
+    quote = connection.ops.quote_name
+    table, default, partition = quote(TABLE), quote(DEFAULT_PARTITION), quote(name)
+    # Bounds are written out as literals, older servers don't take expressions here
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    columns = ', '.join(quote(field.column) for field in Content._meta.concrete_fields)
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Blocks writes to the default partition (reads carry on) so no row for the
+        # period lands there between moving the rows out and attaching
+        cursor.execute(f"LOCK TABLE {default} IN EXCLUSIVE MODE")
+        cursor.execute(f"SELECT 1 FROM {default} WHERE pub_date >= %s AND pub_date < %s LIMIT 1", [start, end])
+        if cursor.fetchone() is None:
+            cursor.execute(f"CREATE TABLE {partition} PARTITION OF {table} FOR VALUES {bounds}")
+            return
+        cursor.execute(f"CREATE TABLE {partition} (LIKE {table} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default} WHERE pub_date >= %s AND pub_date < %s RETURNING {columns}) "
+            f"INSERT INTO {partition} ({columns}) SELECT {columns} FROM moved",
+            [start, end],
+        )
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {partition} FOR VALUES {bounds}")
+
+
+def drop_expired_partitions(before, categories):
+    """Drop the period partitions that end on or before `before`; returns their names.
+
+    A partition that still holds rows of a category outside `categories`
+    (those retention deletes on its own) is kept.
+    """
+    quote = connection.ops.quote_name
+    dropped = []
+    for name, upper in list_partitions():
+        if upper > before:
+            break
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT 1 FROM {quote(name)} WHERE NOT (category = ANY(%s)) LIMIT 1", [list(categories)])
+            if cursor.fetchone() is not None:
+                print(f"Keeping content partition {name}, it holds entries retention doesn't manage")
+                continue
+        try:
+            _detach_partition(name)
+        except OperationalError as e:
+            # Most likely the lock timeout; the partition is dropped on a later run
+            print(f"Couldn't detach content partition {name}: {e}")
+            break
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {quote(name)}")
+        dropped.append(name)
+    return dropped
+
+
+def _detach_partition(name):
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('lock_timeout', %s, false)", [f"{settings.CONTENT_PARTITION_LOCK_TIMEOUT}s"])
+        try:
+            for attempt in range(1, DETACH_ATTEMPTS + 1):
+                try:
+                    cursor.execute(f"ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}")
+                    return
+                except OperationalError:
+                    if attempt == DETACH_ATTEMPTS or connection.in_atomic_block:
+                        raise
+                    time.sleep(attempt)
+        finally:
+            cursor.execute("RESET lock_timeout")
+
+
+def convert_to_partitioned(interval=None):
+    """Turn the content table into a partitioned one, keeping its rows as the default partition.
+
+    Returns the names of the period partitions created after the conversion.
+    """
+    interval = interval or settings.CONTENT_PARTITION_INTERVAL
+    quote = connection.ops.quote_name
+    table, default = quote(TABLE), quote(DEFAULT_PARTITION)
+    sequence = quote(f'{TABLE}_id_seq')
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", [TABLE])
+        indexes = cursor.fetchall()
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {default}")
+        # A table has one primary key; the partition gets the parent's (id, pub_date) one when attached
+        cursor.execute(f"ALTER TABLE {default} DROP CONSTRAINT {quote(TABLE + '_pkey')}")
+        # Unique constraints are rebuilt with pub_date below
+        for constraint in Content._meta.constraints:
+            cursor.execute(f"ALTER TABLE {default} DROP CONSTRAINT IF EXISTS {quote(constraint.name)}")
+        # Plain indexes are recreated on the new table under their own names; the
+        # renamed originals match them, so attaching the partition doesn't rebuild them
+        plain_indexes = [(name, sql) for name, sql in indexes if not sql.startswith('CREATE UNIQUE')]
+        for name, _ in plain_indexes:
+            cursor.execute(f"ALTER INDEX {quote(name)} RENAME TO {quote(name[:61] + '_d')}")
+
+        # Partitioned tables can't use identity columns before PostgreSQL 17, so ids come from a plain sequence
+        cursor.execute(f"ALTER TABLE {default} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute(f"ALTER TABLE {default} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {sequence}")
+        cursor.execute(f"CREATE TABLE {table} (LIKE {default} INCLUDING DEFAULTS) PARTITION BY RANGE (pub_date)")
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute(f"SELECT setval('{sequence}', COALESCE(MAX(id), 0) + 1, false) FROM {default}")
+
+        cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, pub_date)")
+        for constraint in Content._meta.constraints:
+            columns = ', '.join(quote(Content._meta.get_field(name).column) for name in (*constraint.fields, 'pub_date'))
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {quote(constraint.name)} UNIQUE ({columns})")
+        for field in Content._meta.concrete_fields:
+            if isinstance(field, models.ForeignKey):
+                cursor.execute(
+                    f"ALTER TABLE {table} ADD CONSTRAINT {quote(f'{TABLE}_{field.column}_fk')} "
+                    f"FOREIGN KEY ({quote(field.column)}) "
+                    f"REFERENCES {quote(field.related_model._meta.db_table)} ({quote(field.target_field.column)}) "
+                    f"DEFERRABLE INITIALLY DEFERRED"
+                )
+        for _, definition in plain_indexes:
+            cursor.execute(definition)
+
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+
+    # The current period's rows are in the default partition, so new partitions start with the next one
+    return create_partitions(interval=interval, now=next_period(period_start(timezone.now(), interval), interval))
@@ -0,0 +1,323 @@
+"""Streaming ingest: fetch -> parse -> normalize -> dedup -> image-resolve -> bulk-write.
+
+Every stage is a generator consuming the one before it. Fetching, parsing and
+normalising need no database access, so each runs on its own thread and hands
+its output on through a bounded queue (parsing can also be moved to a process
+pool, see `parse_stage`); once a queue is full the stage feeding
+it waits, so a slow stage holds back the ones before it instead of letting
+work pile up in memory. Dedup, image resolution and writing use the database
+and run in the calling thread, batching their work `INGEST_WRITE_BATCH`
+entries at a time.
+
+A run stores at most `INGEST_MAX_ITEMS_PER_RUN` new entries within
+`INGEST_TIME_BUDGET` seconds. Feeds cut short by either budget are fetched
+again after `FEED_POLL_MIN_INTERVAL`, with a full download, so the entries
+left behind are picked up by the next run instead of being dropped.
+"""
+import multiprocessing
+import queue
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .fetcher import iter_feeds
+from .http_client import connection_stats
+from .models import RSSFeed
+from .normalize import parse_and_normalize
+from .utils import Entry, dedup_entries, field_limits, resolve_images, write_entries
+
+
+# Passed down the pipeline after the last entry of a feed
+FeedDone = namedtuple('FeedDone', ['feed', 'result'])
+
+_END = object()
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+class IngestRun:
+    """Budgets and bookkeeping shared by the stages of one pipeline run."""
+
+    def __init__(self, max_items=None, time_budget=None):
+        self.max_items = max_items or settings.INGEST_MAX_ITEMS_PER_RUN
+        self.deadline = time.monotonic() + (time_budget or settings.INGEST_TIME_BUDGET)
+        self.stopped = threading.Event()
+        self.taken = 0
+        self.truncated = set()
+
+    def remaining(self):
+        return max(0, self.deadline - time.monotonic())
+
+    def take(self, entry):
+        """Claim budget for one more entry; False marks its feed as cut short."""
+        if self.taken >= self.max_items or not self.remaining():
+            self.truncated.add(entry.source_feed.pk)
+            return False
+        self.taken += 1
+        return True
+
+
+def record_fetch(feed, result, new_items=0, truncated=False):
+    """Store the outcome of a download on the feed and schedule its next fetch.
+
+    Successful fetches (including 304s) store the cache validators and adapt
+    the polling interval to how many new entries turned up; failures push the
+    next attempt out exponentially. A `truncated` fetch left entries behind,
+    so the validators are cleared and the feed is fetched again soon.
+    """
+    now = timezone.now()
+    if not (result.ok or result.not_modified):
+        # Trip the feed's breaker: back off exponentially until the host recovers
+        failures = feed.failure_count + 1
+        retry_at = now + timedelta(seconds=feed.failure_cooldown(failures))
+        RSSFeed.objects.filter(pk=feed.pk).update(
+            failure_count=failures,
+            next_fetch_at=retry_at,
+            fetch_error=f"{result.error} ({failures} consecutive failures, next attempt {retry_at:%Y-%m-%d %H:%M} UTC)",
+        )
+        return
+
+    poll_interval, update_interval = feed.adapt_poll_interval(new_items, now)
+    fields = {
+        'last_fetched': now,
+        'fetch_error': '',
+        'failure_count': 0,
+        'poll_interval': poll_interval,
+        'update_interval': update_interval,
+        'next_fetch_at': now + timedelta(seconds=poll_interval),
+    }
+    if result.not_modified:
+        fields['cache_hits'] = F('cache_hits') + 1
+    elif truncated:
+        fields.update(
+            cache_misses=F('cache_misses') + 1,
+            etag='',
+            last_modified='',
+            next_fetch_at=now + timedelta(seconds=settings.FEED_POLL_MIN_INTERVAL),
+        )
+    else:
+        fields.update(
+            cache_misses=F('cache_misses') + 1,
+            etag=result.headers.get('etag', '')[:255],
+            last_modified=result.headers.get('last-modified', '')[:100],
+        )
+    RSSFeed.objects.filter(pk=feed.pk).update(**fields)
+
+
+def _buffered(stream, run, maxsize=None):
+    """Run a stage on its own thread, handing its output on through a bounded queue."""
+    buffer = queue.Queue(maxsize or settings.INGEST_QUEUE_SIZE)
+    errors = []
+
+    def put(item):
+        while not run.stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def pump():
+        try:
+            for item in stream:
+                if not put(item):
+                    break
+        except Exception as e:
+            errors.append(e)
+        finally:
+            stream.close()
+            put(_END)
+
+    threading.Thread(target=pump, name="ingest-stage", daemon=True).start()
+    while True:
+        try:
+            item = buffer.get(timeout=run.remaining())
+        except queue.Empty:
+            return  # out of time; the run stops the producer when it finishes
+        if item is _END:
+            break
+        yield item
+    if errors:
+        raise errors[0]
+
+
+def fetch_stage(feeds):
+    """Yield (feed, result) pairs as the downloads complete."""
+    by_url = {feed.url: feed for feed in feeds}
+    results = iter_feeds(
+        list(by_url),
+        request_headers={feed.url: feed.conditional_headers() for feed in feeds},
+    )
+    for result in results:
+        yield by_url[result.url], result
+
+
+def _get_parse_pool():
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # Forking this multi-threaded process directly could copy locks held by
+            # other threads, so parser processes are forked from a clean server process
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=settings.INGEST_PARSE_PROCESSES, mp_context=multiprocessing.get_context('forkserver'),
+            )
+        return _parse_pool
+
+
+def _reset_parse_pool(pool):
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_args(feed, result):
+    return result.content, result.url, result.headers, field_limits(feed.content_model)
+
+
+def _parsed(feed, result, future=None, pool=None):
+    """Return (feed, result, records), taking the records from `future` if the parser pool has them."""
+    if not result.ok:
+        if not result.not_modified:
+            print(f"Failed to fetch {result.url}: {result.error}")
+        # A 304 means unchanged since the last run: nothing to parse or store
+        return feed, result, []
+    if future is not None:
+        try:
+            return feed, result, future.result()
+        except BrokenProcessPool:
+            # A parser process died; parse this one here and start a fresh pool next time
+            _reset_parse_pool(pool)
+        except Exception as e:
+            print(f"Failed to parse {result.url}: {e}")
+            return feed, result, []
+    return feed, result, parse_and_normalize(*_parse_args(feed, result))
+
+
+def parse_stage(stream):
+    """Yield (feed, result, records) for each download.
+
+    With `INGEST_PARSE_PROCESSES` set, the XML parsing and text clean-up run in
+    a process pool so large feeds don't hold the GIL; results still come out
+    in download order.
+    """
+    processes = settings.INGEST_PARSE_PROCESSES
+    if not processes:
+        for feed, result in stream:
+            yield _parsed(feed, result)
+        return
+
+    pool = _get_parse_pool()
+    pending = deque()
+    for feed, result in stream:
+        future = None
+        if result.ok:
+            try:
+                future = pool.submit(parse_and_normalize, *_parse_args(feed, result))
+            except BrokenProcessPool:
+                _reset_parse_pool(pool)
+                pool = _get_parse_pool()
+        pending.append((feed, result, future, pool))
+        # Keep every process busy without holding more than a couple of payloads each
+        while pending and (len(pending) > 2 * processes or not pending[0][2] or pending[0][2].done()):
+            yield _parsed(*pending.popleft())
+    while pending:
+        yield _parsed(*pending.popleft())
+
+
+def normalize_stage(stream):
+    for feed, result, records in stream:
+        for record in records:
+            yield Entry.from_record(record, feed.content_model, feed)
+        yield FeedDone(feed, result)
+
+
+def dedup_stage(stream, batch_size=None):
+    batch_size = batch_size or settings.INGEST_WRITE_BATCH
+    seen, batch = {}, []
+    for item in stream:
+        if isinstance(item, FeedDone):
+            yield from dedup_entries(batch, seen)
+            batch = []
+            yield item
+            continue
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield from dedup_entries(batch, seen)
+            batch = []
+    yield from dedup_entries(batch, seen)
+
+
+def image_stage(stream, run):
+    for item in stream:
+        if isinstance(item, FeedDone):
+            yield item
+        elif run.take(item):
+            yield from resolve_images([item])
+
+
+def write_stage(stream, batch_size=None):
+    """Bulk-insert entries and yield (feed, result, new_items) once a feed is fully written."""
+    batch_size = batch_size or settings.INGEST_WRITE_BATCH
+    batch, written = [], Counter()
+
+    def flush():
+        for entry in write_entries(batch):
+            written[entry.source_feed.pk] += 1
+        batch.clear()
+
+    for item in stream:
+        if isinstance(item, FeedDone):
+            flush()
+            yield item.feed, item.result, written.pop(item.feed.pk, 0)
+            continue
+        batch.append(item)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+
+def run_ingest(feeds, max_items=None, time_budget=None):
+    """Fetch the given `RSSFeed` rows and store their new entries.
+
+    Returns the number of entries saved.
+    """
+    feeds = list(feeds)
+    run = IngestRun(max_items, time_budget)
+    finished = set()
+    saved = 0
+    try:
+        stream = _buffered(fetch_stage(feeds), run)
+        stream = _buffered(parse_stage(stream), run)
+        stream = _buffered(normalize_stage(stream), run)
+        for feed, result, new_items in write_stage(image_stage(dedup_stage(stream), run)):
+            record_fetch(feed, result, new_items, truncated=feed.pk in run.truncated)
+            finished.add(feed.pk)
+            saved += new_items
+    finally:
+        run.stopped.set()
+
+    # The time budget ran out before these feeds were done with
+    unfinished = [feed.pk for feed in feeds if feed.pk not in finished]
+    if unfinished:
+        print(f"Ingest time budget exceeded, {len(unfinished)} feeds rescheduled")
+        RSSFeed.objects.filter(pk__in=unfinished).update(
+            next_fetch_at=timezone.now() + timedelta(seconds=settings.FEED_POLL_MIN_INTERVAL),
+        )
+    stats = connection_stats()
+    print(
+        f"Ingest saved {saved} entries; connections reused for "
+        f"{stats['feeds']['reused']}/{stats['feeds']['requests']} feed and "
+        f"{stats['images']['reused']}/{stats['images']['requests']} image requests so far"
+    )
+    return saved
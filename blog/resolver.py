@@ -0,0 +1,95 @@
+"""Cached DNS resolution for outbound requests to untrusted hosts.
+
+`safe_resolver` remembers, per hostname, either the public address it
+resolved to or that it must not be contacted (private address, or no answer).
+`PinnedConnectionMixin` makes urllib3 connections open their socket to
+exactly the address that was checked, so a host can't pass the check and
+then rebind to an internal address for the actual connection, and redirects
+get the same check.
+"""
+import ipaddress
+import socket
+import time
+
+from django.conf import settings
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import create_connection
+
+from .image_cache import LRUCache
+
+
+def _is_public(addr):
+    return not (addr.is_private or addr.is_loopback or addr.is_link_local or addr.is_reserved)
+
+
+class SafeResolver:
+    """Resolves hostnames to a public IP address, caching answers and refusals.
+
+    Successful lookups are reused for `ttl` seconds and failed or unsafe ones
+    for `negative_ttl` seconds. A hostname counts as safe only if every
+    address it resolves to is public.
+    """
+
+    def __init__(self, ttl, negative_ttl, maxsize):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache = LRUCache(maxsize)
+
+    def resolve(self, hostname):
+        """Return the public IP to connect to for `hostname`, or None to refuse it."""
+        hostname = hostname.lower().rstrip('.')
+        try:
+            # IP literals need no lookup
+            addr = ipaddress.ip_address(hostname)
+            return str(addr) if _is_public(addr) else None
+        except ValueError:
+            pass
+
+        cached = self._cache.get(hostname)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        try:
+            _, _, addresses = socket.gethostbyname_ex(hostname)
+            addrs = [ipaddress.ip_address(address) for address in addresses]
+        except (socket.gaierror, socket.herror, UnicodeError, ValueError):
+            addrs = []
+        address = str(addrs[0]) if addrs and all(map(_is_public, addrs)) else None
+        ttl = self.ttl if address else self.negative_ttl
+        self._cache.set(hostname, (address, time.monotonic() + ttl))
+        return address
+
+    def clear(self):
+        self._cache.clear()
+
+
+safe_resolver = SafeResolver(
+    ttl=settings.DNS_CACHE_TTL,
+    negative_ttl=settings.DNS_CACHE_NEGATIVE_TTL,
+    maxsize=settings.DNS_CACHE_SIZE,
+)
+
+
+class PinnedConnectionMixin:
+    """Opens the socket to the address `safe_resolver` approved for the host.
+
+    The hostname itself is kept for the Host header, SNI and certificate checks.
+    """
+
+    def _new_conn(self):
+        address = safe_resolver.resolve(self.host)
+        if address is None:
+            raise NewConnectionError(self, f"Refusing to connect to {self.host}: not a public address")
+        try:
+            return create_connection(
+                (address, self.port),
+                self.timeout,
+                source_address=self.source_address,
+                socket_options=self.socket_options,
+            )
+        except socket.timeout as e:
+            raise ConnectTimeoutError(
+                self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+            ) from e
+        except OSError as e:
+            raise NewConnectionError(self, f"Failed to establish a new connection: {e}") from e
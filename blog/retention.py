@@ -0,0 +1,89 @@
+"""Retention cleanup: deletes expired rows a bounded batch at a time.
+
+Deleting a month of content in one statement holds locks on the whole range
+and, once a model has signals or related rows, makes Django load every row
+first. `delete_in_batches` instead walks the matching rows in primary-key
+order and deletes them `RETENTION_DELETE_BATCH` at a time, pausing
+`RETENTION_DELETE_PAUSE` seconds between batches so ingest and page reads on
+the same tables aren't held up.
+
+Each category keeps its entries for `CONTENT_RETENTION_DAYS`, unless
+`CONTENT_RETENTION_OVERRIDES` gives it a window of its own. When the content
+table is partitioned (see `blog.partitions`), periods past every category's
+window are dropped whole first.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import CATEGORY_CONTENT_MODELS, ContentFingerprint, ImageProbe
+from .partitions import drop_expired_partitions, is_partitioned
+from .stats import content_counter, increment, reconcile
+from .versions import bump_versions
+
+
+def retention_days(category):
+    """Days entries of `category` are kept."""
+    return settings.CONTENT_RETENTION_OVERRIDES.get(category, settings.CONTENT_RETENTION_DAYS)
+
+
+def delete_in_batches(queryset, batch_size=None, pause=None):
+    """Delete the rows of `queryset` one primary-key range at a time.
+
+    Each range holds at most `batch_size` matching rows and is deleted by a
+    statement of its own. Returns the number of rows deleted.
+    """
+    batch_size = batch_size or settings.RETENTION_DELETE_BATCH
+    pause = settings.RETENTION_DELETE_PAUSE if pause is None else pause
+
+    queryset = queryset.order_by()
+    deleted = 0
+    last_pk = None
+    while True:
+        remaining = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        # The pk `batch_size` rows in closes this range; if there is none, what's left fits in one batch
+        upper = list(remaining.order_by('pk').values_list('pk', flat=True)[batch_size - 1:batch_size])
+        batch = remaining.filter(pk__lte=upper[0]) if upper else remaining
+        deleted += batch.delete()[0]
+        if not upper:
+            return deleted
+        last_pk = upper[0]
+        if pause:
+            time.sleep(pause)
+
+
+def purge_expired(batch_size=None, pause=None):
+    """Delete content past its category's retention window, plus stale fingerprints and probes.
+
+    Returns `(deleted, counts)` where `counts` maps each category to the
+    number of its entries deleted.
+    """
+    now = timezone.now()
+    longest = max(retention_days(category) for category in CATEGORY_CONTENT_MODELS)
+    if is_partitioned():
+        dropped = drop_expired_partitions(now - timedelta(days=longest), CATEGORY_CONTENT_MODELS)
+        for name in dropped:
+            print(f"Dropped content partition {name}")
+        if dropped:
+            bump_versions(CATEGORY_CONTENT_MODELS)
+            # Nothing says how many rows a partition held, so recount
+            reconcile(now)
+
+    counts = {}
+    for category, model in CATEGORY_CONTENT_MODELS.items():
+        cutoff = now - timedelta(days=retention_days(category))
+        counts[category] = delete_in_batches(model.objects.filter(pub_date__lt=cutoff), batch_size, pause)
+    bump_versions(category for category in CATEGORY_CONTENT_MODELS if counts[category])
+    increment({content_counter(category): -counts[category] for category in CATEGORY_CONTENT_MODELS})
+
+    # Fingerprints are shared by all categories, so they last as long as the longest window
+    counts['fingerprints'] = delete_in_batches(
+        ContentFingerprint.objects.filter(pub_date__lt=now - timedelta(days=longest)), batch_size, pause,
+    )
+    # Expired image probes would be re-checked anyway, so don't keep them around
+    counts['image_probes'] = delete_in_batches(
+        ImageProbe.objects.filter(checked_at__lt=now - timedelta(seconds=settings.IMAGE_PROBE_TTL)), batch_size, pause,
+    )
+    return sum(counts[category] for category in CATEGORY_CONTENT_MODELS), counts
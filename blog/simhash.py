@@ -0,0 +1,77 @@
+"""64-bit SimHash fingerprints for spotting near-duplicate articles.
+
+Texts that share most of their words get fingerprints that differ in only a
+few bits. Splitting the fingerprint into `BANDS` bands of 16 bits means two
+fingerprints within `BANDS - 1` bits of each other always agree on at least
+one whole band, so candidates can be found with exact lookups on the bands
+and then confirmed with the Hamming distance.
+
+No Django imports here, so parser processes can fingerprint entries too.
+"""
+import hashlib
+import re
+
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+_BAND_MASK = (1 << BAND_BITS) - 1
+
+_WORD = re.compile(r'\w+')
+
+
+def simhash(text, min_words=8):
+    """Return the fingerprint of `text`, or None if it has fewer than `min_words` words.
+
+    Very short texts (e.g. a bare job title) carry too little to tell
+    different articles apart.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < min_words:
+        return None
+    # Word pairs keep some word order, so reshuffled boilerplate doesn't match
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    weights = [0] * BITS
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'big')
+        for bit in range(BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def bands(value):
+    """Split a fingerprint into its `BANDS` 16-bit bands, lowest bits first."""
+    return tuple((value >> (band * BAND_BITS)) & _BAND_MASK for band in range(BANDS))
+
+
+def distance(a, b):
+    """Number of bits two fingerprints differ in."""
+    return bin(a ^ b).count('1')
+
+
+def to_signed(value):
+    """Map an unsigned fingerprint into the range of a signed 64-bit column."""
+    return value - (1 << BITS) if value >= 1 << (BITS - 1) else value
+
+
+def from_signed(value):
+    return value + (1 << BITS) if value < 0 else value
+
+
+class SimHashIndex:
+    """In-memory banded index answering "is there a fingerprint within N bits?"."""
+
+    def __init__(self, max_distance=BANDS - 1):
+        self.max_distance = max_distance
+        self._bands = [{} for _ in range(BANDS)]
+
+    def add(self, value):
+        for band, key in zip(self._bands, bands(value)):
+            band.setdefault(key, []).append(value)
+
+    def near(self, value):
+        for band, key in zip(self._bands, bands(value)):
+            for candidate in band.get(key, ()):
+                if distance(value, candidate) <= self.max_distance:
+                    return True
+        return False
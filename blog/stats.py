@@ -0,0 +1,182 @@
+"""Materialised counters for the admin dashboard.
+
+Counting every table on each dashboard load gets slower as the tables grow,
+so each number is a `SiteStat` row instead. Signals and the ingest pipeline
+adjust the rows as rows come and go, and `read_stats` fetches them all with
+one query. Numbers over the last week ("new users") are kept as per-day
+counters such as ``users.joined:2026-10-17`` and summed over the window.
+
+Incremental counts can drift, e.g. when a content partition is dropped
+whole or a row is changed through a queryset update. `reconcile` recounts
+everything from the tables; the `reconcile_stats` task runs it daily.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from forum.models import Post
+from medical_imaging.models import ArticleComment, MedicalImagingArticle
+from personal_blog.models import BlogPost
+from stories.models import Story
+
+from .models import CATEGORY_CONTENT_MODELS, Content, SiteStat, UserBookmark
+
+WINDOW_DAYS = 7
+
+
+def content_counter(category):
+    return f'content:{category}'
+
+
+def day_counter(name, moment):
+    return f'{name}:{timezone.localdate(moment):%Y-%m-%d}'
+
+
+def is_day_counter(name):
+    base, _, day = name.partition(':')
+    return base in WINDOWED and bool(day)
+
+
+def window_counters(name, now=None):
+    """The per-day counters of `name` covering the last `WINDOW_DAYS` days, today included."""
+    today = timezone.localdate(now)
+    return [f'{name}:{today - timedelta(days=days):%Y-%m-%d}' for days in range(WINDOW_DAYS)]
+
+
+# The counters each row of a tracked model adds one to
+TRACKED = {
+    User: lambda user: ['users', day_counter('users.joined', user.date_joined)] + (['users.staff'] if user.is_staff else []),
+    UserBookmark: lambda bookmark: ['bookmarks', day_counter('bookmarks.created', bookmark.created_at)],
+    Post: lambda post: ['forum_posts'],
+    MedicalImagingArticle: lambda article: ['medical_articles', f'medical_articles.{article.status}'],
+    ArticleComment: lambda comment: [] if comment.is_approved else ['comments.pending'],
+    BlogPost: lambda post: ['blog_posts'],
+    Story: lambda story: ['stories'],
+}
+
+# Counters that always exist once `reconcile` has run
+TOTALS = (
+    [content_counter(category) for category in CATEGORY_CONTENT_MODELS]
+    + ['users', 'users.staff', 'bookmarks', 'forum_posts', 'medical_articles', 'comments.pending', 'blog_posts', 'stories']
+    + [f'medical_articles.{status}' for status, _ in MedicalImagingArticle.STATUS_CHOICES]
+)
+WINDOWED = ['users.joined', 'bookmarks.created']
+
+
+def increment(changes):
+    """Add each delta of `changes` (counter name -> delta) to its stored counter."""
+    for name, delta in changes.items():
+        if not delta:
+            continue
+        if SiteStat.objects.filter(name=name).update(value=F('value') + delta, updated_at=timezone.now()):
+            continue
+        # Only a new day's counter is started here; a missing total waits for `reconcile`
+        # rather than counting up from zero
+        if is_day_counter(name) and delta > 0:
+            try:
+                with transaction.atomic():
+                    SiteStat.objects.create(name=name, value=delta)
+            except IntegrityError:
+                SiteStat.objects.filter(name=name).update(value=F('value') + delta, updated_at=timezone.now())
+
+
+def read_stats(now=None):
+    """Every counter in one query, with each windowed counter summed under its base name.
+
+    Recounts first if a total is missing, as before the first `reconcile`.
+    """
+    windows = {name: window_counters(name, now) for name in WINDOWED}
+    names = TOTALS + [counter for counters in windows.values() for counter in counters]
+    values = dict(SiteStat.objects.filter(name__in=names).values_list('name', 'value'))
+    if any(name not in values for name in TOTALS):
+        values = reconcile(now)
+    stats = {name: values.get(name, 0) for name in TOTALS}
+    for name, counters in windows.items():
+        stats[name] = sum(values.get(counter, 0) for counter in counters)
+    return stats
+
+
+def _daily(name, queryset, field, now):
+    counters = dict.fromkeys(window_counters(name, now), 0)
+    first_day = timezone.localdate(now) - timedelta(days=WINDOW_DAYS - 1)
+    since = timezone.make_aware(datetime.combine(first_day, time.min))
+    days = queryset.filter(**{f'{field}__gte': since}).annotate(day=TruncDate(field))
+    for day, count in days.order_by().values_list('day').annotate(Count('pk')):
+        counters[f'{name}:{day:%Y-%m-%d}'] = count
+    return counters
+
+
+def reconcile(now=None):
+    """Recount every counter from the tables, store the results and return them."""
+    now = now or timezone.now()
+    values = dict.fromkeys(TOTALS, 0)
+    for category, count in Content.objects.order_by().values_list('category').annotate(Count('pk')):
+        values[content_counter(category)] = count
+    values['users'] = User.objects.count()
+    values['users.staff'] = User.objects.filter(is_staff=True).count()
+    values['bookmarks'] = UserBookmark.objects.count()
+    values['forum_posts'] = Post.objects.count()
+    for status, count in MedicalImagingArticle.objects.order_by().values_list('status').annotate(Count('pk')):
+        values['medical_articles'] += count
+        values[f'medical_articles.{status}'] = count
+    values['comments.pending'] = ArticleComment.objects.filter(is_approved=False).count()
+    values['blog_posts'] = BlogPost.objects.count()
+    values['stories'] = Story.objects.count()
+    values.update(_daily('users.joined', User.objects.all(), 'date_joined', now))
+    values.update(_daily('bookmarks.created', UserBookmark.objects.all(), 'created_at', now))
+
+    with transaction.atomic():
+        # Also drops the day counters that have left the window
+        SiteStat.objects.exclude(name__in=values).delete()
+        SiteStat.objects.bulk_create(
+            [SiteStat(name=name, value=value) for name, value in values.items()],
+            update_conflicts=True, unique_fields=['name'], update_fields=['value', 'updated_at'],
+        )
+    return values
+
+
+def _remember_counters(sender, instance, **kwargs):
+    # What a loaded row counts towards, so a later save can move it between counters
+    if instance.pk is not None and not instance.get_deferred_fields():
+        instance._stat_counters = TRACKED[sender](instance)
+
+
+def _row_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = [] if created else getattr(instance, '_stat_counters', None)
+    if old is None:
+        # Loaded without every field, so what it counted towards is unknown; left to `reconcile`
+        return
+    new = TRACKED[sender](instance)
+    changes = Counter(new)
+    changes.subtract(old)
+    increment(changes)
+    instance._stat_counters = new
+
+
+def _row_deleted(sender, instance, **kwargs):
+    counters = getattr(instance, '_stat_counters', None)
+    if counters is None and not instance.get_deferred_fields():
+        counters = TRACKED[sender](instance)
+    increment({name: -1 for name in counters or []})
+
+
+def _content_saved(sender, instance, created, raw=False, **kwargs):
+    # Content is bulk-inserted and batch-deleted without signals; those paths count for themselves
+    if created and not raw and isinstance(instance, Content):
+        increment({content_counter(instance.category): 1})
+
+
+def connect_signals():
+    for model in TRACKED:
+        post_init.connect(_remember_counters, sender=model, dispatch_uid=f'stats_init_{model._meta.label}')
+        post_save.connect(_row_saved, sender=model, dispatch_uid=f'stats_save_{model._meta.label}')
+        post_delete.connect(_row_deleted, sender=model, dispatch_uid=f'stats_delete_{model._meta.label}')
+    post_save.connect(_content_saved, dispatch_uid='stats_content_save')
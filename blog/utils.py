@@ -1,39 +1,37 @@
-import html
-import ipaddress
-import socket
+import threading
+import time
+from collections import Counter
 import requests
-import re
-from io import BytesIO
+from dataclasses import dataclass
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from PIL import Image
-from dateutil import parser
 from urllib.parse import urlparse
 
-from django.db import IntegrityError, transaction
+from django.conf import settings
+from django.db import DatabaseError, transaction
 from django.db.models import Q
 
-
-CLEANR = re.compile('<.*?>')
-
-def cleanhtml(raw_html):
-    cleantext = re.sub(CLEANR, '', raw_html)
-    return cleantext
-
-
-def extract_images_from_html(html_content):
-    """Extract image URLs from HTML content."""
-    if not html_content:
-        return []
-    # Find all img src attributes
-    img_pattern = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
-    return img_pattern.findall(html_content)
+from .breaker import HostCircuitBreaker
+from .http_client import image_session
+from .image_cache import get_cached_probe, store_probe
+from .imagesize import read_image_size
+from .models import Content, ContentFingerprint
+from .normalize import gather_image_candidates, normalize_items
+from .resolver import safe_resolver
+from .simhash import SimHashIndex, bands, from_signed, to_signed
+from .stats import content_counter, increment
+from .versions import bump_versions
 
 
 def _is_safe_url(url):
     """Return True only for public HTTP/HTTPS URLs (blocks SSRF to private/link-local addresses).
 
-    Resolves domain names to their IP addresses before checking to prevent DNS
-    rebinding attacks where a hostname initially resolves to a public IP but is
-    later rebinding to a private address.
+    Domain names are resolved and checked through `safe_resolver`, which
+    caches the verdict per hostname. Requests made with `image_session` then
+    connect to the very address that was checked, which prevents DNS
+    rebinding attacks where a hostname first resolves to a public IP and
+    later to a private one.
     """
     try:
         parsed = urlparse(url)
@@ -42,38 +40,134 @@ def _is_safe_url(url):
         hostname = parsed.hostname
         if not hostname:
             return False
-        try:
-            # Direct IP literal — check immediately
-            addr = ipaddress.ip_address(hostname)
-        except ValueError:
-            # Domain name — resolve to IP and then check
-            try:
-                resolved = socket.gethostbyname(hostname)
-                addr = ipaddress.ip_address(resolved)
-            except socket.gaierror:
-                # DNS resolution failed — block the URL
-                return False
-        if addr.is_private or addr.is_loopback or addr.is_link_local or addr.is_reserved:
-            return False
-        return True
+        return safe_resolver.resolve(hostname) is not None
     except Exception:
         return False
 
 
-def validate_image_url(url, min_width=200):
-    """Validate an image URL and return its width if valid."""
+# Image hosts that keep timing out or refusing connections are skipped for a while
+image_hosts = HostCircuitBreaker(
+    'image-host',
+    threshold=settings.IMAGE_HOST_BREAKER_THRESHOLD,
+    base_cooldown=settings.IMAGE_HOST_BREAKER_COOLDOWN,
+    max_cooldown=settings.IMAGE_HOST_BREAKER_MAX_COOLDOWN,
+)
+
+
+def _image_host(url):
+    return (urlparse(url).hostname or '').lower()
+
+
+def _probe_image(url):
+    """Fetch an image's (width, height, content_type), or None if unusable.
+
+    Only the first `IMAGE_PROBE_HEADER_BYTES` are normally read; see
+    `blog.imagesize.read_image_size`.
+    """
     if not _is_safe_url(url):
-        return 0
+        return None
+    host = _image_host(url)
     try:
-        response = requests.get(url, stream=True, timeout=5)
-        response.raise_for_status()
-        img = Image.open(BytesIO(response.content))
-        width = img.size[0]
-        if width >= min_width:
-            return width
+        with image_session.get(url, stream=True) as response:
+            if response.status_code >= 500:
+                image_hosts.record_failure(host)
+            else:
+                image_hosts.record_success(host)
+            response.raise_for_status()
+            size = read_image_size(response, settings.IMAGE_PROBE_HEADER_BYTES)
+        return size.width, size.height, size.content_type
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        image_hosts.record_failure(host)
+        return None
     except (requests.exceptions.RequestException, IOError, Image.DecompressionBombWarning):
-        pass
-    return 0
+        return None
+
+
+def validate_image_url(url, min_width=200):
+    """Validate an image URL and return its width if valid.
+
+    Results, including failures, are cached so a URL seen in an earlier run is
+    answered without any network access until its cache entry expires. URLs on
+    a host whose circuit breaker is open are rejected without a request.
+    """
+    probe = get_cached_probe(url)
+    if probe is None:
+        if image_hosts.is_open(_image_host(url)):
+            return 0
+        result = _probe_image(url)
+        if result is None:
+            probe = store_probe(url, failed=True)
+        else:
+            probe = store_probe(url, *result)
+    if probe.failed or probe.width < min_width:
+        return 0
+    return probe.width
+
+
+class ImageProbeBatch:
+    """Probes a set of image URLs concurrently under one shared deadline.
+
+    Cached results are answered straight away, URLs on hosts with an open
+    circuit breaker are treated as failures, and the rest are fetched on a
+    shared thread pool and recorded in the cache as they are collected. Use
+    as a context manager so probes nobody waited for are cancelled on exit.
+    """
+
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    def __init__(self, urls, deadline=None):
+        self.deadline = time.monotonic() + (deadline or settings.IMAGE_PROBE_DEADLINE)
+        self._probes = {}
+        self._futures = {}
+        for url in dict.fromkeys(urls):
+            probe = get_cached_probe(url)
+            if probe is not None:
+                self._probes[url] = probe
+            elif not image_hosts.is_open(_image_host(url)):
+                self._futures[url] = self._get_pool().submit(_probe_image, url)
+
+    @classmethod
+    def _get_pool(cls):
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = ThreadPoolExecutor(
+                    max_workers=settings.IMAGE_PROBE_MAX_WORKERS, thread_name_prefix="image-probe"
+                )
+            return cls._pool
+
+    def _collect(self, url, future, timeout):
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return None
+        if result is None:
+            probe = store_probe(url, failed=True)
+        else:
+            probe = store_probe(url, *result)
+        self._probes[url] = probe
+        return probe
+
+    def width(self, url, min_width=200):
+        """Same contract as `validate_image_url`; 0 if the deadline passes first."""
+        probe = self._probes.get(url)
+        if probe is None and url in self._futures:
+            probe = self._collect(url, self._futures.pop(url), max(0, self.deadline - time.monotonic()))
+        if probe is None or probe.failed or probe.width < min_width:
+            return 0
+        return probe.width
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for url, future in self._futures.items():
+            if future.done() and not future.cancelled():
+                # Finished anyway, so keep the result for the next lookup
+                self._collect(url, future, 0)
+            else:
+                future.cancel()
+        self._futures.clear()
 
 
 def find_content_image(item):
@@ -83,133 +177,236 @@ def find_content_image(item):
     the largest available image when multiple options exist.
     Also extracts images from HTML content as fallback.
     """
-    # Priority order: full-size images first, thumbnails last
-    image_fields = ["media_content", "enclosures", "links", "media_group", "image", "media_thumbnail", "thumbnail"]
+    return find_best_image(*gather_image_candidates(item))
 
-    best_image = None
-    best_width = 0
-
-    for field in image_fields:
-        if not hasattr(item, field):
-            continue
 
-        value = getattr(item, field)
-        if not value:
-            continue
+def find_best_image(media, inline):
+    """Pick the image for an item from the candidates of `gather_image_candidates`.
 
-        # Handle list of media items
-        if isinstance(value, list):
-            for media_item in value:
-                if not isinstance(media_item, dict):
-                    continue
+    All candidates are probed concurrently; the first one (in priority order)
+    that reaches 400px wins as soon as it and everything ahead of it is known.
+    """
+    if not media and not inline:
+        return None
 
-                url = media_item.get("url")
-                if not url:
-                    continue
+    best_image = None
+    best_width = 0
 
-                # Skip non-image content types
-                media_type = media_item.get("type", "")
-                if media_type and not media_type.startswith("image"):
+    with ImageProbeBatch([url for url, _ in media] + inline) as batch:
+        for url, width in media:
+            if width is None:
+                width = batch.width(url)
+            # If we have a width and it's larger, or no best yet
+            elif width > best_width or (best_image is None and width == 0):
+                actual_width = batch.width(url)
+                if actual_width <= 0:
                     continue
+                if width == 0:
+                    width = actual_width
+            else:
+                continue
 
-                # Get width if available, prefer larger images
-                width = 0
-                if "width" in media_item:
-                    try:
-                        width = int(media_item["width"])
-                    except (ValueError, TypeError):
-                        pass
-
-                # If we have a width and it's larger, or no best yet
-                if width > best_width or (best_image is None and width == 0):
-                    actual_width = validate_image_url(url)
-                    if actual_width > 0:
-                        if width == 0:
-                            width = actual_width
-                        if width > best_width:
-                            best_width = width
-                            best_image = url
-                        if best_width >= 400:
-                            return best_image
-
-        # Handle single dict value
-        elif isinstance(value, dict) and "url" in value:
-            url = value["url"]
-            width = validate_image_url(url)
             if width > best_width:
                 best_width = width
                 best_image = url
             if best_width >= 400:
                 return best_image
 
-    # If no image found in media fields, try extracting from HTML content
-    if not best_image:
-        html_fields = ['content', 'summary', 'description']
-        for field in html_fields:
-            content = item.get(field, '')
-            if isinstance(content, list) and content:
-                content = content[0].get('value', '') if isinstance(content[0], dict) else str(content[0])
-
-            if content:
-                img_urls = extract_images_from_html(content)
-                for url in img_urls[:3]:  # Check first 3 images only
-                    # Skip tiny icons and tracking pixels
-                    if any(skip in url.lower() for skip in ['icon', 'logo', 'badge', 'button', 'tracking', '1x1']):
-                        continue
-                    width = validate_image_url(url)
-                    if width > best_width:
-                        best_width = width
-                        best_image = url
-                    if best_width >= 400:
-                        return best_image
+        # If no image found in media fields, try the images embedded in HTML content
+        if not best_image:
+            for url in inline:
+                width = batch.width(url)
+                if width > best_width:
+                    best_width = width
+                    best_image = url
+                if best_width >= 400:
+                    return best_image
 
     return best_image
 
 
-def save_new_contents(feed, Content):
-    """Saves new contents to the database.
+@dataclass
+class Entry:
+    """A feed item normalised into the fields of a `Content` row."""
+    content_model: type
+    source_feed: object
+    content_name: str
+    guid: str
+    link: str
+    pub_date: datetime
+    title: str
+    description: str
+    media: list
+    inline: list
+    simhash: int = None
+    guid_hash: int = None
+    link_hash: int = None
+    image: str = None
+
+    @classmethod
+    def from_record(cls, record, Content, source_feed=None):
+        return cls(Content, source_feed, *record)
+
+    @property
+    def category(self):
+        return self.content_model.content_category
+
+    def to_content(self):
+        return self.content_model(
+            category=self.category,
+            title=self.title,
+            description=self.description,
+            pub_date=self.pub_date,
+            link=self.link,
+            content_name=self.content_name,
+            guid=self.guid,
+            guid_hash=self.guid_hash,
+            link_hash=self.link_hash,
+            image=self.image,
+            source_feed=self.source_feed,
+        )
+
+    def to_fingerprint(self):
+        return ContentFingerprint(
+            content_model=self.content_model._meta.model_name,
+            simhash=to_signed(self.simhash),
+            pub_date=self.pub_date,
+            **{f'band_{band}': value for band, value in enumerate(bands(self.simhash))},
+        )
+
+
+def field_limits(Content):
+    """Max lengths of the columns `normalize_items` truncates or checks against."""
+    return {name: Content._meta.get_field(name).max_length for name in ('content_name', 'guid', 'link', 'title')}
+
+
+def normalize_entries(feed, Content, source_feed=None):
+    """Yield an `Entry` for every usable item of a parsed feed."""
+    for record in normalize_items(feed, field_limits(Content)):
+        yield Entry.from_record(record, Content, source_feed)
+
+
+def dedup_entries(entries, seen=None):
+    """Return the entries that are not stored yet, in order.
+
+    Entries are matched within their category on the hashes of their GUID
+    and canonical link, with one lookup query for all categories. `seen`
+    maps a category to the (guid hashes, link hashes) already handled; pass
+    the same dict to successive calls to also drop entries repeated across
+    batches.
+    """
+    seen = {} if seen is None else seen
+    guid_hashes, link_hashes = set(), set()
+    for entry in entries:
+        seen_guids, seen_links = seen.setdefault(entry.category, (set(), set()))
+        # Empty GUIDs/links have no hash, so they never match each other
+        if entry.guid_hash is not None and entry.guid_hash not in seen_guids:
+            guid_hashes.add(entry.guid_hash)
+        if entry.link_hash is not None and entry.link_hash not in seen_links:
+            link_hashes.add(entry.link_hash)
+
+    if guid_hashes or link_hashes:
+        known = Content.objects.filter(
+            Q(guid_hash__in=guid_hashes) | Q(link_hash__in=link_hashes),
+            category__in={entry.category for entry in entries},
+        )
+        for category, guid_hash, link_hash in known.values_list('category', 'guid_hash', 'link_hash'):
+            seen_guids, seen_links = seen.setdefault(category, (set(), set()))
+            seen_guids.add(guid_hash)
+            seen_links.add(link_hash)
+
+    fresh = []
+    for entry in entries:
+        seen_guids, seen_links = seen[entry.category]
+        if (entry.guid_hash is not None and entry.guid_hash in seen_guids) or \
+                (entry.link_hash is not None and entry.link_hash in seen_links):
+            continue
+        # Also skips an entry repeated within the same feed
+        seen_guids.add(entry.guid_hash)
+        seen_links.add(entry.link_hash)
+        fresh.append(entry)
+    return drop_near_duplicates(fresh, seen)
 
-    Checks the content GUID against the contents currently stored in the
-    database. If not found, then a new `Content` is added to the database.
 
-    Args:
-        feed: requires a feedparser object
+def drop_near_duplicates(entries, seen=None):
+    """Drop entries whose SimHash is within a few bits of a stored or earlier entry's.
+
+    Checks every content category at once with a single query on the
+    fingerprint bands. `seen` is the same dict `dedup_entries` takes; the
+    fingerprints accepted so far are kept in it under `ContentFingerprint`.
     """
+    seen = {} if seen is None else seen
+    index = seen.setdefault(ContentFingerprint, SimHashIndex())
+    fingerprints = {entry.simhash for entry in entries if entry.simhash is not None}
+    if not fingerprints:
+        return entries
+
+    lookup = Q()
+    for band, values in enumerate(zip(*map(bands, fingerprints))):
+        lookup |= Q(**{f'band_{band}__in': set(values)})
+    for value in ContentFingerprint.objects.filter(lookup).values_list('simhash', flat=True):
+        index.add(from_signed(value))
+
+    kept = []
+    for entry in entries:
+        if entry.simhash is not None:
+            if index.near(entry.simhash):
+                continue
+            index.add(entry.simhash)
+        kept.append(entry)
+    return kept
 
-    try:
-        content_title = feed.channel.get('title', 'Technology')
-    except AttributeError:
-        content_title = "Technology"
 
-    new_items = 0
-    for item in feed.entries:
+def resolve_images(entries):
+    """Yield the entries with their best image attached, dropping any that fail."""
+    for entry in entries:
         try:
-            if new_items >= 3:
-                break
-            guid = item.get('guid', item.get('id', ''))
-            link = item.get('link', item.get('url', ''))
-            if Content.objects.filter(Q(guid=guid) | Q(link=link)).exists():
-                continue
-            content_image = find_content_image(item)
-            tzinfos = {"PDT": -25200, "PST": -28800}  # PDT and PST offsets in seconds
-            pub_date = parser.parse(item.get('published', item.get('updated', '')), tzinfos=tzinfos)
-            description = html.unescape(cleanhtml(item.get('description', item.get('summary', ''))))
-            title = html.unescape(cleanhtml(item.get('title', item.get('name', ''))))
-            content = Content(
-                title=title,
-                description=description,
-                pub_date=pub_date,
-                link=link,
-                content_name=content_title,
-                guid=guid,
-                image=content_image,
-            )
-            try:
-                with transaction.atomic():
-                    content.save()
-                new_items += 1
-            except IntegrityError:
-                # Another worker inserted the same item concurrently — skip it
-                pass
+            entry.image = find_best_image(entry.media, entry.inline)
         except Exception as e:
-            print(f"An error occurred while saving the contents for {content_title}: {e}")
+            print(f"An error occurred while saving the contents for {entry.content_name}: {e}")
+            continue
+        yield entry
+
+
+def write_entries(entries):
+    """Bulk-insert entries of any category with one insert and return those actually inserted."""
+    entries = list(entries)
+    if not entries:
+        return []
+    try:
+        with transaction.atomic():
+            # Rows that clash with a unique constraint, e.g. written meanwhile by an overlapping
+            # run, are skipped instead of failing the batch, and left out of everything below
+            inserted = Counter(Content.objects.insert_new([entry.to_content() for entry in entries]))
+            written = []
+            for entry in entries:
+                key = (entry.category, entry.guid_hash, entry.link_hash)
+                if inserted[key]:
+                    inserted[key] -= 1
+                    written.append(entry)
+            fingerprints = [entry.to_fingerprint() for entry in written if entry.simhash is not None]
+            if fingerprints:
+                ContentFingerprint.objects.bulk_create(fingerprints)
+            increment(Counter(content_counter(entry.category) for entry in written))
+    except DatabaseError as e:
+        print(f"An error occurred while saving the contents for {entries[0].content_name}: {e}")
+        return []
+    bump_versions(entry.category for entry in written)
+    return written
+
+
+def save_new_contents(feed, Content, source_feed=None):
+    """Saves new contents to the database.
+
+    Looks up the GUIDs and links of the whole feed against the contents
+    currently stored in the database in a single query, then inserts the
+    entries that were not found with one bulk insert.
+
+    Args:
+        feed: requires a feedparser object
+        source_feed: the `RSSFeed` the entries came from, if known
+    """
+    entries = dedup_entries(list(normalize_entries(feed, Content, source_feed)))
+    if not entries:
+        return 0
+    return len(write_entries(list(resolve_images(entries))))
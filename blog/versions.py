@@ -0,0 +1,69 @@
+"""Per-category content versions, bumped whenever a category's stored entries change.
+
+Anything cached from a category's entries (rendered pages, HTTP validators)
+puts the category's version in its key, so it goes stale exactly when ingest,
+cleanup or an admin edit changes the rows. Versions live in the shared cache.
+A missing version starts from the current time, so one lost to eviction or a
+cache restart never comes back with a value an old cache entry was keyed on.
+
+Next to each version the cache keeps when it last moved, which HTTP
+Last-Modified headers are based on. A time that has gone missing counts as
+now, which can only make clients fetch the page again.
+"""
+import time
+
+from django.core.cache import cache
+
+from .models import Content
+
+
+def _key(category):
+    return f'content-version:{category}'
+
+
+def _changed_key(category):
+    return f'content-changed:{category}'
+
+
+def _initial():
+    return time.time_ns() // 1000
+
+
+def get_versions(categories, with_changed=False):
+    """Map each of `categories` to its current version, in one cache round trip when they all exist.
+
+    With `with_changed`, returns `(versions, changed)` where `changed` is the
+    Unix time the most recently changed of them last moved.
+    """
+    keys = {_key(category): category for category in categories}
+    changed_keys = {_changed_key(category): category for category in categories} if with_changed else {}
+    found = cache.get_many([*keys, *changed_keys])
+    versions = {keys[key]: found[key] for key in keys if key in found}
+    changed = {changed_keys[key]: found[key] for key in changed_keys if key in found}
+    for category in categories:
+        if category not in versions:
+            cache.add(_key(category), _initial(), timeout=None)
+            versions[category] = cache.get(_key(category))
+        if with_changed and category not in changed:
+            cache.add(_changed_key(category), time.time(), timeout=None)
+            changed[category] = cache.get(_changed_key(category), time.time())
+    if with_changed:
+        return versions, max(changed.values(), default=time.time())
+    return versions
+
+
+def bump_versions(categories):
+    for category in set(categories):
+        try:
+            cache.incr(_key(category))
+        except ValueError:
+            cache.set(_key(category), _initial(), timeout=None)
+        # After the version: a page read in between gets the old time, which at worst makes
+        # a client fetch it again, never the new time with the old content
+        cache.set(_changed_key(category), time.time(), timeout=None)
+
+
+def content_changed(sender, instance, **kwargs):
+    """`post_save` receiver for rows saved one at a time; `bulk_create` callers bump the version themselves."""
+    if isinstance(instance, Content) and instance.category:
+        bump_versions([instance.category])
@@ -1,28 +1,31 @@
-import logging
-
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.contrib.auth.models import User
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, TemplateView
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_protect
-from django.utils import timezone
-from datetime import timedelta
 
-from .models import *
+from forum.models import Post as ForumPost
+from medical_imaging.models import MedicalImagingArticle
+from personal_blog.models import BlogPost
+from stories.models import Story
 
-logger = logging.getLogger(__name__)
+from .models import *
+from .page_cache import PageCacheMixin
+from .pagination import KeysetPaginationMixin
+from .stats import content_counter, read_stats
 
 
 @method_decorator(csrf_protect, name='dispatch')
-class HomePageView(ListView):
+class HomePageView(PageCacheMixin, KeysetPaginationMixin, ListView):
     template_name = "index.html"
     model = GeneralContent
     paginate_by = 20
+    estimate_count = True
     context_object_name = 'contents'
 
     def get_queryset(self):
-        return self.model.objects.exclude(image=None).order_by("-pub_date")
+        # Spelled as IS NOT NULL so the planner can use the partial blog_content_listing index
+        return self.model.objects.filter(image__isnull=False).order_by("-pub_date", "-pk")
 
 
 @method_decorator(csrf_protect, name='dispatch')
@@ -86,87 +89,61 @@ class AdminDashboardView(LoginRequiredMixin, StaffRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        now = timezone.now()
-        week_ago = now - timedelta(days=7)
 
-        # Content stats
+        # Every count comes from the materialised counters, one query (see blog.stats)
+        stats = read_stats()
         context['stats'] = {
-            'total_general': GeneralContent.objects.count(),
-            'total_ai': AIContent.objects.count(),
-            'total_crypto': CryptoContent.objects.count(),
-            'total_cyber': CyberSecurityContent.objects.count(),
-            'total_python': PythonContent.objects.count(),
-            'total_software': SoftwareDevelopmentContent.objects.count(),
-            'total_uiux': UiUxContent.objects.count(),
-            'total_mobile': MobilePcContent.objects.count(),
-            'total_jobs': JobUpdatesContent.objects.count(),
-            'total_medical': MedicalNewsContent.objects.count(),
-            'total_ai_imaging': AIMedicalImagingContent.objects.count(),
+            key: stats[content_counter(category)]
+            for key, category in (
+                ('total_general', 'general'),
+                ('total_ai', 'ai'),
+                ('total_crypto', 'crypto'),
+                ('total_cyber', 'cybersecurity'),
+                ('total_python', 'python'),
+                ('total_software', 'software_dev'),
+                ('total_uiux', 'ui_ux'),
+                ('total_mobile', 'mobile_pc'),
+                ('total_jobs', 'jobs'),
+                ('total_medical', 'medical_news'),
+                ('total_ai_imaging', 'ai_medical_imaging'),
+            )
         }
 
         # Calculate total RSS content
         context['total_rss_content'] = sum(context['stats'].values())
 
         # RSS Feeds
-        context['rss_feeds'] = RSSFeed.objects.all().order_by('category', 'name')
-        context['active_feeds'] = RSSFeed.objects.filter(is_active=True).count()
-        context['inactive_feeds'] = RSSFeed.objects.filter(is_active=False).count()
+        context['rss_feeds'] = list(RSSFeed.objects.all().order_by('category', 'name'))
+        context['active_feeds'] = sum(feed.is_active for feed in context['rss_feeds'])
+        context['inactive_feeds'] = len(context['rss_feeds']) - context['active_feeds']
 
         # User stats
-        context['total_users'] = User.objects.count()
-        context['staff_users'] = User.objects.filter(is_staff=True).count()
-        context['recent_users'] = User.objects.filter(date_joined__gte=week_ago).count()
+        context['total_users'] = stats['users']
+        context['staff_users'] = stats['users.staff']
+        context['recent_users'] = stats['users.joined']
 
-        # Recent content (last 10 from each major category)
+        # Recent content (last 5 from each major category)
         context['recent_general'] = GeneralContent.objects.order_by('-pub_date')[:5]
         context['recent_ai'] = AIContent.objects.order_by('-pub_date')[:5]
         context['recent_medical'] = MedicalNewsContent.objects.order_by('-pub_date')[:5]
 
         # Bookmarks stats
-        context['total_bookmarks'] = UserBookmark.objects.count()
-        context['recent_bookmarks'] = UserBookmark.objects.filter(created_at__gte=week_ago).count()
-
-        # Import models from other apps for comprehensive stats
-        try:
-            from forum.models import Post as ForumPost
-            context['total_forum_posts'] = ForumPost.objects.count()
-            context['recent_forum_posts'] = ForumPost.objects.order_by('-created_on')[:5]
-        except Exception:
-            logger.exception("Failed to load forum stats for admin dashboard")
-            context['total_forum_posts'] = 0
-            context['recent_forum_posts'] = []
-
-        try:
-            from medical_imaging.models import MedicalImagingArticle, ArticleComment
-            context['total_medical_articles'] = MedicalImagingArticle.objects.count()
-            context['published_medical_articles'] = MedicalImagingArticle.objects.filter(status='published').count()
-            context['draft_medical_articles'] = MedicalImagingArticle.objects.filter(status='draft').count()
-            context['pending_comments'] = ArticleComment.objects.filter(is_approved=False).count()
-            context['recent_medical_articles'] = MedicalImagingArticle.objects.order_by('-created_at')[:5]
-        except Exception:
-            logger.exception("Failed to load medical imaging stats for admin dashboard")
-            context['total_medical_articles'] = 0
-            context['published_medical_articles'] = 0
-            context['draft_medical_articles'] = 0
-            context['pending_comments'] = 0
-            context['recent_medical_articles'] = []
-
-        try:
-            from personal_blog.models import BlogPost
-            context['total_blog_posts'] = BlogPost.objects.count()
-            context['recent_blog_posts'] = BlogPost.objects.order_by('-created_at')[:5]
-        except Exception:
-            logger.exception("Failed to load personal blog stats for admin dashboard")
-            context['total_blog_posts'] = 0
-            context['recent_blog_posts'] = []
-
-        try:
-            from stories.models import Story
-            context['total_stories'] = Story.objects.count()
-            context['recent_stories'] = Story.objects.order_by('-created_at')[:5]
-        except Exception:
-            logger.exception("Failed to load stories stats for admin dashboard")
-            context['total_stories'] = 0
-            context['recent_stories'] = []
+        context['total_bookmarks'] = stats['bookmarks']
+        context['recent_bookmarks'] = stats['bookmarks.created']
+
+        context['total_forum_posts'] = stats['forum_posts']
+        context['recent_forum_posts'] = ForumPost.objects.order_by('-created_on')[:5]
+
+        context['total_medical_articles'] = stats['medical_articles']
+        context['published_medical_articles'] = stats['medical_articles.published']
+        context['draft_medical_articles'] = stats['medical_articles.draft']
+        context['pending_comments'] = stats['comments.pending']
+        context['recent_medical_articles'] = MedicalImagingArticle.objects.order_by('-created_at')[:5]
+
+        context['total_blog_posts'] = stats['blog_posts']
+        context['recent_blog_posts'] = BlogPost.objects.order_by('-created_at')[:5]
+
+        context['total_stories'] = stats['stories']
+        context['recent_stories'] = Story.objects.order_by('-created_at')[:5]
 
         return context
@@ -39,58 +39,80 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_ACCEPT_CONTENT = ['json']
 
-# Celery Beat Schedule - All content refreshed every 12 hours
+# Celery Beat Schedule - the scheduler fans out one task per due RSSFeed row
 CELERY_BEAT_SCHEDULE = {
-    'fetch-general-content': {
-        'task': 'blog.tasks.fetch_general_content',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-ai-content': {
-        'task': 'blog.tasks.fetch_ai_content',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-crypto-content': {
-        'task': 'blog.tasks.fetch_crypto_content',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-cyber-content': {
-        'task': 'blog.tasks.fetch_cyber_content',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-software-development': {
-        'task': 'blog.tasks.fetch_sd_content',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-mobile-pc-content': {
-        'task': 'blog.tasks.fetch_mobile_pc_content',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-medical-news': {
-        'task': 'blog.tasks.fetch_medical_news',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-python-content': {
-        'task': 'blog.tasks.fetch_python_content',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-ui-ux-content': {
-        'task': 'blog.tasks.fetch_ui_ux_content',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-ai-medical-imaging': {
-        'task': 'blog.tasks.fetch_ai_medical_imaging',
-        'schedule': 12 * 60 * 60,  # 12 hours
-    },
-    'fetch-tech-jobs': {
-        'task': 'blog.tasks.fetch_tech_jobs',
-        'schedule': 12 * 60 * 60,  # 12 hours
+    'schedule-feeds': {
+        'task': 'blog.tasks.schedule_feeds',
+        'schedule': 5 * 60,  # 5 minutes
     },
     'cleanup-old-content': {
         'task': 'blog.tasks.cleanup_old_content',
         'schedule': 7 * 24 * 60 * 60,  # Weekly (7 days)
     },
+    'reconcile-stats': {
+        'task': 'blog.tasks.reconcile_stats',
+        'schedule': 24 * 60 * 60,  # Daily
+    },
 }
 
+# Feed ingestion - download (blog.fetcher) and scheduling (blog.tasks.schedule_feeds) settings
+FEED_FETCH_MAX_WORKERS = int(os.getenv("FEED_FETCH_MAX_WORKERS", "8"))
+FEED_FETCH_PER_HOST_LIMIT = int(os.getenv("FEED_FETCH_PER_HOST_LIMIT", "2"))
+FEED_FETCH_TIMEOUT = float(os.getenv("FEED_FETCH_TIMEOUT", "15"))  # seconds per request
+FEED_FETCH_TIME_BUDGET = float(os.getenv("FEED_FETCH_TIME_BUDGET", "60"))  # seconds per batch
+FEED_POLL_INTERVAL = 12 * 60 * 60  # starting interval between fetches of a feed, in seconds
+FEED_POLL_MIN_INTERVAL = 15 * 60  # busiest feeds are polled at most this often
+FEED_POLL_MAX_INTERVAL = 7 * 24 * 60 * 60  # quiet feeds are still polled at least weekly
+FEED_POLL_BACKOFF = 1.5  # interval multiplier after a fetch with nothing new
+FEED_POLL_SMOOTHING = 0.3  # weight of the latest observation in the update-interval average
+FEED_SCHEDULER_BATCH = 500  # most feeds dispatched per scheduler run
+
+# Pooled HTTP sessions shared by feed downloads and image probes (blog.http_client)
+HTTP_POOL_HOSTS = 100  # hosts whose connection pools are kept around
+HTTP_POOL_PER_HOST = 8  # keep-alive connections per host; at least FEED_FETCH_PER_HOST_LIMIT and IMAGE_PROBE_MAX_WORKERS
+HTTP_CONNECT_TIMEOUT = 5  # seconds
+HTTP_READ_TIMEOUT = 10  # seconds between bytes; feed downloads use FEED_FETCH_TIMEOUT instead
+
+# Streaming ingest pipeline (blog.pipeline) - feeds cut short by a budget are fetched again soon
+INGEST_MAX_ITEMS_PER_RUN = int(os.getenv("INGEST_MAX_ITEMS_PER_RUN", "500"))  # new entries stored per run
+INGEST_TIME_BUDGET = float(os.getenv("INGEST_TIME_BUDGET", "240"))  # seconds per run
+INGEST_QUEUE_SIZE = 50  # items buffered between two pipeline stages
+INGEST_WRITE_BATCH = 100  # entries per dedup lookup and bulk insert
+INGEST_PARSE_PROCESSES = int(os.getenv("INGEST_PARSE_PROCESSES", "0"))  # parser processes; 0 parses in a thread
+
+# Retention (blog.retention) - cleanup_old_content deletes expired rows in small batches
+CONTENT_RETENTION_DAYS = int(os.getenv("CONTENT_RETENTION_DAYS", "30"))  # default window for every category
+CONTENT_RETENTION_OVERRIDES = {}  # RSSFeed.category -> days, e.g. {'jobs': 14} to expire job posts sooner
+RETENTION_DELETE_BATCH = 1000  # most rows deleted per statement
+RETENTION_DELETE_PAUSE = 0.05  # seconds between batches
+# Optional PostgreSQL partitioning of blog_content on pub_date (blog.partitions), see `manage.py content_partitions`
+CONTENT_PARTITION_INTERVAL = os.getenv("CONTENT_PARTITION_INTERVAL", "month")  # 'week' or 'month'
+CONTENT_PARTITIONS_AHEAD = 3  # future periods kept ready
+CONTENT_PARTITION_LOCK_TIMEOUT = 2  # seconds a partition detach waits for its lock before trying again
+# Rendered listing pages for anonymous visitors (blog.page_cache), invalidated by content versions
+PAGE_CACHE_TIMEOUT = 60 * 60
+BUILD_ID = os.getenv("BUILD_ID", "")  # set per deploy to start cached pages and ETags afresh; defaults to a hash of the templates
+
+# Image probe cache used by blog.utils.validate_image_url
+IMAGE_PROBE_TTL = 30 * 24 * 60 * 60  # 30 days for images that checked out
+IMAGE_PROBE_NEGATIVE_TTL = 24 * 60 * 60  # 1 day before retrying a failed image
+IMAGE_PROBE_LRU_SIZE = 5000  # in-process entries in front of the database table
+IMAGE_PROBE_HEADER_BYTES = 64 * 1024  # read at most this much for the dimensions; 0 = full download
+IMAGE_PROBE_MAX_WORKERS = 8  # concurrent image probes per worker process
+IMAGE_PROBE_DEADLINE = 8  # seconds to evaluate all image candidates of one feed item
+
+# DNS cache for image hosts (blog.resolver). The system resolver doesn't report record
+# TTLs, so answers are reused for a fixed time, kept short enough to follow CDN changes.
+DNS_CACHE_TTL = 5 * 60
+DNS_CACHE_NEGATIVE_TTL = 60  # unresolvable or private hostnames are re-checked after this
+DNS_CACHE_SIZE = 2048
+
+# Circuit breakers - failing image hosts are skipped, failing feeds back off exponentially
+IMAGE_HOST_BREAKER_THRESHOLD = 3  # consecutive failures before a host is skipped
+IMAGE_HOST_BREAKER_COOLDOWN = 5 * 60  # first cool-down in seconds, doubled per further failure
+IMAGE_HOST_BREAKER_MAX_COOLDOWN = 6 * 60 * 60
+FEED_BREAKER_MAX_COOLDOWN = 7 * 24 * 60 * 60  # longest a failing feed waits before its next attempt
+
 # Adding SSL configuration
 # Setting ssl_cert_reqs as a dictionary format in transport options here didn't work which is interesting
 # CELERY_BROKER_URL = os.environ.get('REDIS_TLS_URL', 'redis://localhost:6379/0')
@@ -207,6 +229,23 @@ else:
 #         "default": dj_database_url.parse(os.environ.get("DATABASE_URL")),
 #     }
 
+# Cache
+# Shared through Redis in production so state such as the image host circuit
+# breakers is seen by every web and worker process.
+if DEVELOPMENT_MODE is True:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": redis_url,
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
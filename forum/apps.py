@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ForumConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'forum'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from .context_processors import posts_changed
+        from .models import Post
+
+        post_save.connect(posts_changed, sender=Post, dispatch_uid='recent_posts_save')
+        post_delete.connect(posts_changed, sender=Post, dispatch_uid='recent_posts_delete')
@@ -1,6 +1,45 @@
+"""Context shared by every template.
+
+`recent_posts` feeds the sidebar of most pages, so it is kept in two cache
+levels keyed on the shared ``recent-posts`` content version (see
+`blog.versions`): a copy in the process, reused while the version stays the
+same, in front of the shared cache. Saving or deleting a post bumps the
+version once the change is committed, so every process, and every cached
+page showing the sidebar, moves to the new list together. The list is only
+looked up when a template actually uses it.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+
+from blog.versions import bump_versions, get_versions
 from forum.models import Post
 
+RECENT_POSTS_COUNT = 3
+# Content version cached pages that show the sidebar are keyed on (see blog.page_cache)
+RECENT_POSTS_VERSION = 'recent-posts'
+
+_local = {'version': None, 'posts': None}
+
+
+def recent_posts():
+    version = get_versions([RECENT_POSTS_VERSION])[RECENT_POSTS_VERSION]
+    if _local['version'] == version:
+        return _local['posts']
+    key = f'forum:recent-posts:{version}'
+    posts = cache.get(key)
+    if posts is None:
+        posts = list(Post.objects.order_by('-created_on')[:RECENT_POSTS_COUNT])
+        cache.set(key, posts)
+    _local.update(version=version, posts=posts)
+    return posts
+
+
+def posts_changed(sender, **kwargs):
+    """`post_save`/`post_delete` receiver for `Post`."""
+    # After the commit, so no process can read the old list under the new version
+    transaction.on_commit(lambda: bump_versions([RECENT_POSTS_VERSION]))
+
 
 def get_recent_posts(request):
-    recent_posts = Post.objects.order_by('-created_on')[:3]
-    return {'recent_posts': recent_posts}
\ No newline at end of file
+    return {'recent_posts': SimpleLazyObject(recent_posts)}
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0002_category_unique_post_author_fk'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created_on'], name='forum_post_created_idx'),
+        ),
+    ]
@@ -24,6 +24,12 @@ class Post(models.Model):
     last_modified = models.DateTimeField(auto_now=True)
     categories = models.ManyToManyField('Category', related_name='posts')
 
+    class Meta:
+        indexes = [
+            # Recent posts in the sidebar of every page
+            models.Index(fields=['-created_on'], name='forum_post_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
+
+from blog.stats import increment
 
 from .models import (
     MedicalImagingContent, MedicalImagingArticle,
@@ -89,10 +92,15 @@ class ArticleCommentAdmin(admin.ModelAdmin):
             return qs
         return qs.filter(article__author=request.user)
 
+    # update() sends no post_save, so the pending-comments counter is adjusted here
     @admin.action(description='Approve selected comments')
     def approve_comments(self, request, queryset):
-        queryset.update(is_approved=True)
+        with transaction.atomic():
+            approved = queryset.filter(is_approved=False).update(is_approved=True)
+            increment({'comments.pending': -approved})
 
     @admin.action(description='Reject selected comments')
     def reject_comments(self, request, queryset):
-        queryset.update(is_approved=False)
+        with transaction.atomic():
+            rejected = queryset.filter(is_approved=True).update(is_approved=False)
+            increment({'comments.pending': rejected})
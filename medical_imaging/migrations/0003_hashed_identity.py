@@ -0,0 +1,59 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:21
+
+from django.db import migrations, models
+
+from blog.normalize import canonicalize_url, identity_hash
+
+
+def backfill_hashes(apps, schema_editor):
+    """Hash existing GUIDs and links; later duplicates keep a NULL hash so the unique indexes can be built."""
+    Content = apps.get_model('medical_imaging', 'medicalimagingcontent')
+    seen_guids, seen_links, batch = set(), set(), []
+    for row in Content.objects.order_by('pk').only('pk', 'guid', 'link').iterator(chunk_size=2000):
+        guid_hash = identity_hash(row.guid.strip())
+        link_hash = identity_hash(canonicalize_url(row.link))
+        row.guid_hash = guid_hash if guid_hash not in seen_guids else None
+        row.link_hash = link_hash if link_hash not in seen_links else None
+        seen_guids.add(guid_hash)
+        seen_links.add(link_hash)
+        batch.append(row)
+        if len(batch) >= 2000:
+            Content.objects.bulk_update(batch, ['guid_hash', 'link_hash'])
+            batch = []
+    Content.objects.bulk_update(batch, ['guid_hash', 'link_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical_imaging', '0002_alter_articleimage_alt_text_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medicalimagingcontent',
+            name='guid_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='medicalimagingcontent',
+            name='link_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='medicalimagingcontent',
+            name='guid_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='medicalimagingcontent',
+            name='link_hash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='medicalimagingcontent',
+            name='content_name',
+            field=models.CharField(max_length=255),
+        ),
+    ]
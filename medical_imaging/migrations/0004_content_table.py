@@ -0,0 +1,40 @@
+# Generated by Django 4.2.4 on 2026-10-17 06:25
+
+from importlib import import_module
+
+from django.db import migrations
+
+
+copy_table = import_module('blog.migrations.0014_content_table').copy_table
+
+
+def copy_contents(apps, schema_editor):
+    copy_table(apps, schema_editor, apps.get_model('medical_imaging', 'MedicalImagingContent'), 'medical_imaging')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_content_table'),
+        ('medical_imaging', '0003_hashed_identity'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_contents, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='MedicalImagingContent',
+        ),
+        migrations.CreateModel(
+            name='MedicalImagingContent',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Medical Imaging Content',
+                'verbose_name_plural': 'Medical Imaging Contents',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('blog.content',),
+        ),
+    ]
@@ -3,14 +3,16 @@ from django.contrib.auth.models import User
 from django.utils.text import slugify
 from django.urls import reverse
 
-from blog.models import BaseModel
+from blog.models import Content
 
 
-class MedicalImagingContent(BaseModel):
+class MedicalImagingContent(Content):
+    content_category = 'medical_imaging'
+
     class Meta:
+        proxy = True
         verbose_name = 'Medical Imaging Content'
         verbose_name_plural = 'Medical Imaging Contents'
-        ordering = ['-pub_date']
 
 
 class MedicalImagingArticle(models.Model):
@@ -11,7 +11,9 @@ from django.views.decorators.csrf import csrf_protect
 
 from .models import MedicalImagingContent, MedicalImagingArticle, ArticleComment
 from .forms import MedicalImagingArticleForm, ArticleCommentForm
-from blog.models import MedicalNewsContent, AIMedicalImagingContent
+from blog.models import Content, MedicalNewsContent, AIMedicalImagingContent
+from blog.page_cache import PageCacheMixin
+from blog.pagination import KeysetPaginationMixin
 
 
 class AuthorRequiredMixin:
@@ -35,14 +37,11 @@ class MedicalImagingIndexView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
-        # Return the 12 most recent items from either medical news or AI imaging.
-        # We use a fixed slice from each source and return the combined list sorted in
-        # Python. Pagination is intentionally disabled for this landing page (paginate_by
-        # is not set on this view) so loading 12 records is bounded and safe.
-        from itertools import chain
-        medical = MedicalNewsContent.objects.order_by('-pub_date')[:6]
-        ai_imaging = AIMedicalImagingContent.objects.order_by('-pub_date')[:6]
-        return sorted(chain(medical, ai_imaging), key=lambda x: x.pub_date, reverse=True)[:12]
+        # The 12 most recent items from either medical news or AI imaging, in one
+        # query on the (category, pub_date) index
+        return Content.objects.filter(
+            category__in=['medical_news', 'ai_medical_imaging'],
+        ).order_by('-pub_date')[:12]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -55,24 +54,28 @@ class MedicalImagingIndexView(ListView):
         return context
 
 
-class MedicalNewsView(ListView):
+class MedicalNewsView(PageCacheMixin, KeysetPaginationMixin, ListView):
     """Medical news and healthcare advancements"""
     template_name = 'medical_imaging/medical_news.html'
+    model = MedicalNewsContent
     context_object_name = 'contents'
     paginate_by = 20
+    estimate_count = True
 
     def get_queryset(self):
-        return MedicalNewsContent.objects.order_by('-pub_date')
+        return self.model.objects.order_by('-pub_date', '-pk')
 
 
-class AIImagingNewsView(ListView):
+class AIImagingNewsView(PageCacheMixin, KeysetPaginationMixin, ListView):
     """AI in Medical Imaging news"""
     template_name = 'medical_imaging/ai_imaging_news.html'
+    model = AIMedicalImagingContent
     context_object_name = 'contents'
     paginate_by = 20
+    estimate_count = True
 
     def get_queryset(self):
-        return AIMedicalImagingContent.objects.order_by('-pub_date')
+        return self.model.objects.order_by('-pub_date', '-pk')
 
 
 class MedicalImagingArticlesView(ListView):
@@ -0,0 +1,46 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.test import SimpleTestCase
+
+from blog.http_client import IngestSession
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = self.headers.get('Accept-Encoding', '').encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class IngestSessionTestCase(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = "http://127.0.0.1:%d/" % self.server.server_address[1]
+
+    def test_requests_to_one_host_reuse_a_connection(self):
+        session = IngestSession()
+        for _ in range(5):
+            response = session.get(self.url)
+            self.assertIn('gzip', response.text)
+        self.assertEqual(session.stats.snapshot(), {
+            'requests': 5, 'connections': 1, 'reused': 4, 'reuse_ratio': 0.8,
+        })
+
+    def test_pinned_session_refuses_private_hosts(self):
+        session = IngestSession(pinned=True)
+        with self.assertRaisesRegex(requests.ConnectionError, "not a public address"):
+            session.get(self.url)
+        self.assertEqual(session.stats.snapshot()['connections'], 0)
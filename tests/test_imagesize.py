@@ -0,0 +1,39 @@
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from PIL import Image
+
+from blog.imagesize import parse_image_size
+
+
+def encode(fmt, size=(640, 427), **params):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, fmt, **params)
+    return buffer.getvalue()
+
+
+class ParseImageSizeTestCase(SimpleTestCase):
+    def assertHeaderSize(self, data, content_type, size=(640, 427)):
+        self.assertEqual(parse_image_size(data[:4096]), (*size, content_type))
+
+    def test_png(self):
+        self.assertHeaderSize(encode('PNG'), 'image/png')
+
+    def test_gif(self):
+        self.assertHeaderSize(encode('GIF'), 'image/gif')
+
+    def test_jpeg(self):
+        self.assertHeaderSize(encode('JPEG'), 'image/jpeg')
+        self.assertHeaderSize(encode('JPEG', progressive=True), 'image/jpeg')
+
+    def test_webp(self):
+        self.assertHeaderSize(encode('WEBP'), 'image/webp')
+        self.assertHeaderSize(encode('WEBP', lossless=True), 'image/webp')
+        buffer = BytesIO()
+        Image.new('RGBA', (640, 427), (0, 0, 0, 0)).save(buffer, 'WEBP', exif=b'Exif\x00\x00')
+        self.assertHeaderSize(buffer.getvalue(), 'image/webp')
+
+    def test_truncated_or_unknown_data(self):
+        self.assertIsNone(parse_image_size(encode('JPEG')[:20]))
+        self.assertIsNone(parse_image_size(encode('PNG')[:16]))
+        self.assertIsNone(parse_image_size(b'<html></html>'))
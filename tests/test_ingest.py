@@ -0,0 +1,398 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+import feedparser
+import requests
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from blog.fetcher import FetchResult
+from blog.image_cache import clear_memory_cache
+from blog.models import ContentFingerprint, GeneralContent, ImageProbe, PythonContent, RSSFeed
+from blog.stats import read_stats
+from blog.tasks import fetch_and_save, schedule_feeds
+from blog.utils import find_content_image, image_hosts, save_new_contents, validate_image_url
+
+
+FEED_URL = "https://example.com/feed/"
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Example</title>
+<item><title>First</title><link>https://example.com/1</link><guid>1</guid>
+<description>One</description><pubDate>Mon, 06 Jan 2025 12:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+class ConditionalFetchTestCase(TestCase):
+    def setUp(self):
+        self.feed = RSSFeed.objects.create(name="Example", url=FEED_URL, category='general')
+
+    def fetch(self, result):
+        with mock.patch("blog.pipeline.iter_feeds", return_value=[result]) as iter_feeds:
+            fetch_and_save([self.feed])
+        return iter_feeds
+
+    def test_full_download_stores_validators(self):
+        self.fetch(FetchResult(FEED_URL, status=200, content=RSS, headers={
+            'etag': '"abc"', 'last-modified': 'Mon, 06 Jan 2025 12:00:00 GMT',
+        }))
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.etag, '"abc"')
+        self.assertEqual(self.feed.cache_misses, 1)
+        self.assertIsNotNone(self.feed.last_fetched)
+        self.assertEqual(GeneralContent.objects.get().source_feed, self.feed)
+
+    def test_not_modified_skips_parsing(self):
+        RSSFeed.objects.filter(pk=self.feed.pk).update(etag='"abc"')
+        self.feed.refresh_from_db()
+        with mock.patch("blog.pipeline.parse_and_normalize") as parse:
+            iter_feeds = self.fetch(FetchResult(FEED_URL, status=304))
+        parse.assert_not_called()
+        self.assertEqual(
+            iter_feeds.call_args.kwargs['request_headers'][FEED_URL],
+            {'If-None-Match': '"abc"'},
+        )
+        self.feed.refresh_from_db()
+        self.assertEqual((self.feed.cache_hits, self.feed.cache_misses), (1, 0))
+        self.assertEqual(self.feed.cache_hit_ratio, 1.0)
+
+    def test_errors_back_off_exponentially(self):
+        cooldowns = []
+        for _ in range(3):
+            self.feed.refresh_from_db()
+            started = timezone.now()
+            self.fetch(FetchResult(FEED_URL, status=500, error="HTTP 500"))
+            self.feed.refresh_from_db()
+            cooldowns.append(round((self.feed.next_fetch_at - started).total_seconds() / 3600))
+        self.assertEqual(cooldowns, [12, 24, 48])
+        self.assertEqual(self.feed.failure_count, 3)
+        self.assertTrue(self.feed.fetch_error.startswith("HTTP 500 (3 consecutive failures"))
+
+        self.fetch(FetchResult(FEED_URL, status=304))
+        self.feed.refresh_from_db()
+        self.assertEqual((self.feed.failure_count, self.feed.fetch_error), (0, ''))
+
+
+class ScheduleFeedsTestCase(TestCase):
+    def test_dispatches_each_due_feed_once(self):
+        RSSFeed.objects.update(is_active=False)  # ignore the seeded feeds
+        now = timezone.now()
+        due = RSSFeed.objects.create(name="Due", url="https://a.example.com/feed", category='python')
+        overdue = RSSFeed.objects.create(
+            name="Overdue", url="https://b.example.com/feed", category='crypto',
+            next_fetch_at=now - timedelta(minutes=5),
+        )
+        RSSFeed.objects.create(
+            name="Later", url="https://c.example.com/feed", category='ai',
+            next_fetch_at=now + timedelta(hours=1),
+        )
+        with mock.patch("blog.tasks.fetch_feed.delay") as delay:
+            self.assertEqual(schedule_feeds(), 2)
+            self.assertEqual(schedule_feeds(), 0)
+        self.assertEqual(sorted(call.args[0] for call in delay.call_args_list), sorted([due.pk, overdue.pk]))
+        due.refresh_from_db()
+        self.assertGreater(due.next_fetch_at, now)
+
+
+class AdaptivePollingTestCase(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.feed = RSSFeed(
+            name="Example", url=FEED_URL, category='general',
+            last_fetched=self.now - timedelta(hours=2), poll_interval=4 * 60 * 60,
+        )
+
+    def test_busy_feed_is_polled_sooner(self):
+        poll_interval, update_interval = self.feed.adapt_poll_interval(4, self.now)
+        self.assertEqual(update_interval, 30 * 60)
+        self.assertEqual(poll_interval, 30 * 60)
+
+        # The estimate moves towards new observations rather than jumping to them
+        self.feed.update_interval = update_interval
+        poll_interval, update_interval = self.feed.adapt_poll_interval(100, self.now)
+        self.assertAlmostEqual(update_interval, 0.3 * 72 + 0.7 * 30 * 60)
+
+        self.feed.update_interval = 60
+        poll_interval, _ = self.feed.adapt_poll_interval(100, self.now)
+        self.assertEqual(poll_interval, 15 * 60)  # FEED_POLL_MIN_INTERVAL
+
+    def test_quiet_feed_backs_off_up_to_the_maximum(self):
+        poll_interval, update_interval = self.feed.adapt_poll_interval(0, self.now)
+        self.assertEqual(poll_interval, 6 * 60 * 60)
+        self.assertIsNone(update_interval)
+
+        self.feed.poll_interval = 6 * 24 * 60 * 60
+        self.assertEqual(self.feed.adapt_poll_interval(0, self.now)[0], 7 * 24 * 60 * 60)
+
+    def test_fetch_schedules_the_next_run(self):
+        self.feed.save()
+        with mock.patch("blog.pipeline.iter_feeds", return_value=[FetchResult(FEED_URL, status=304)]):
+            fetch_and_save([self.feed])
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.poll_interval, 6 * 60 * 60)
+        self.assertAlmostEqual(
+            (self.feed.next_fetch_at - self.feed.last_fetched).total_seconds(), 6 * 60 * 60, delta=1,
+        )
+
+
+class ImageProbeCacheTestCase(TestCase):
+    url = "https://cdn.example.com/photo.jpg"
+
+    def setUp(self):
+        clear_memory_cache()
+        self.addCleanup(clear_memory_cache)
+
+    def test_repeat_checks_skip_the_network(self):
+        with mock.patch("blog.utils._probe_image", return_value=(640, 480, "image/jpeg")) as probe:
+            self.assertEqual(validate_image_url(self.url), 640)
+            self.assertEqual(validate_image_url(self.url), 640)
+            clear_memory_cache()  # e.g. a fresh worker process, served from the table
+            self.assertEqual(validate_image_url(self.url, min_width=1000), 0)
+        probe.assert_called_once_with(self.url)
+        self.assertEqual(ImageProbe.objects.get(url=self.url).height, 480)
+
+    def test_failures_are_cached_until_they_expire(self):
+        with mock.patch("blog.utils._probe_image", return_value=None) as probe:
+            self.assertEqual(validate_image_url(self.url), 0)
+            self.assertEqual(validate_image_url(self.url), 0)
+            self.assertEqual(probe.call_count, 1)
+
+            clear_memory_cache()
+            ImageProbe.objects.filter(url=self.url).update(checked_at=timezone.now() - timedelta(days=2))
+            validate_image_url(self.url)
+            self.assertEqual(probe.call_count, 2)
+
+
+class ImageHostBreakerTestCase(TestCase):
+    url = "https://down.example.com/photo.jpg"
+
+    def setUp(self):
+        cache.clear()
+        clear_memory_cache()
+        self.addCleanup(cache.clear)
+        self.addCleanup(clear_memory_cache)
+
+    def test_failing_host_is_skipped_during_cooldown(self):
+        with mock.patch("blog.utils._is_safe_url", return_value=True), \
+                mock.patch("blog.utils.image_session.get", side_effect=requests.exceptions.ConnectTimeout) as get:
+            for i in range(5):
+                self.assertEqual(validate_image_url(f"{self.url}?{i}"), 0)
+        self.assertEqual(get.call_count, 3)  # IMAGE_HOST_BREAKER_THRESHOLD
+        self.assertTrue(image_hosts.is_open("down.example.com"))
+        # Skipped URLs aren't cached as bad images
+        self.assertFalse(ImageProbe.objects.filter(url=f"{self.url}?4").exists())
+
+        image_hosts.record_success("down.example.com")
+        self.assertFalse(image_hosts.is_open("down.example.com"))
+
+    def test_concurrent_failures_all_count(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(image_hosts.record_failure, ["slow.example.com"] * 16))
+        self.assertEqual(cache.get(image_hosts._failures_key("slow.example.com")), 16)
+        self.assertTrue(image_hosts.is_open("slow.example.com"))
+
+
+class FindContentImageTestCase(TestCase):
+    probe_results = {
+        "https://cdn.example.com/small.jpg": (300, 200, "image/jpeg"),
+        "https://cdn.example.com/large.jpg": (800, 600, "image/jpeg"),
+        "https://cdn.example.com/inline.jpg": (1200, 800, "image/jpeg"),
+    }
+
+    def setUp(self):
+        clear_memory_cache()
+        self.addCleanup(clear_memory_cache)
+
+    def fake_probe(self, url):
+        if url == "https://cdn.example.com/slow.jpg":
+            time.sleep(1)
+        return self.probe_results.get(url)
+
+    def find(self, item, **settings):
+        with mock.patch("blog.utils._probe_image", side_effect=self.fake_probe), self.settings(**settings):
+            return find_content_image(feedparser.FeedParserDict(item))
+
+    def test_priority_rules_are_unchanged(self):
+        item = {
+            "media_content": [
+                {"url": "https://cdn.example.com/small.jpg", "type": "image/jpeg"},
+                {"url": "https://cdn.example.com/large.jpg"},  # no declared width and a best exists
+                {"url": "https://cdn.example.com/video.mp4", "type": "video/mp4"},
+            ],
+            "media_thumbnail": [{"url": "https://cdn.example.com/large.jpg", "width": "800"}],
+        }
+        self.assertEqual(self.find(item), "https://cdn.example.com/large.jpg")
+
+    def test_html_images_only_used_without_media(self):
+        item = {
+            "media_content": [{"url": "https://cdn.example.com/small.jpg"}],
+            "summary": '<img src="https://cdn.example.com/inline.jpg">',
+        }
+        self.assertEqual(self.find(item), "https://cdn.example.com/small.jpg")
+        del item["media_content"]
+        self.assertEqual(self.find(item), "https://cdn.example.com/inline.jpg")
+
+    def test_returns_once_a_qualifying_image_is_confirmed(self):
+        item = {
+            "media_content": [{"url": "https://cdn.example.com/large.jpg"}],
+            "summary": '<img src="https://cdn.example.com/slow.jpg">',
+        }
+        started = time.monotonic()
+        self.assertEqual(self.find(item), "https://cdn.example.com/large.jpg")
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_shared_deadline(self):
+        item = {"media_content": [{"url": "https://cdn.example.com/slow.jpg"}]}
+        started = time.monotonic()
+        self.assertIsNone(self.find(item, IMAGE_PROBE_DEADLINE=0.2))
+        self.assertLess(time.monotonic() - started, 0.5)
+
+
+class SaveNewContentsTestCase(TestCase):
+    def make_feed(self, count):
+        items = "".join(
+            f"<item><title>Story {i}</title><link>https://example.com/{i}</link><guid>guid-{i}</guid>"
+            f"<description>Body {i}</description><pubDate>Mon, 06 Jan 2025 12:00:00 GMT</pubDate></item>"
+            for i in range(count)
+        )
+        return feedparser.parse(f'<rss version="2.0"><channel><title>Example</title>{items}</channel></rss>')
+
+    def test_query_count_is_independent_of_feed_size(self):
+        # One exists() query per entry plus a savepoint, insert and release
+        # per new row used to cost 2 + 3 * 4 = 14 queries here; now it is one
+        # lookup, and one bulk insert and counter update wrapped in a savepoint.
+        GeneralContent.objects.create(
+            title="Story 0", description="Body 0", pub_date="2025-01-06T12:00:00Z",
+            link="https://example.com/0", content_name="Example", guid="guid-0",
+        )
+        GeneralContent.objects.create(
+            title="Story 1", description="Body 1", pub_date="2025-01-06T12:00:00Z",
+            link="https://example.com/elsewhere", content_name="Example", guid="guid-1",
+        )
+        with self.assertNumQueries(5):
+            saved = save_new_contents(self.make_feed(20), GeneralContent)
+        self.assertEqual(saved, 18)
+        self.assertEqual(GeneralContent.objects.count(), 20)
+
+    def test_known_entries_cost_one_query(self):
+        save_new_contents(self.make_feed(3), GeneralContent)
+        with self.assertNumQueries(1):
+            self.assertEqual(save_new_contents(self.make_feed(3), GeneralContent), 0)
+
+
+class IngestPipelineTestCase(TestCase):
+    def setUp(self):
+        self.feed = RSSFeed.objects.create(name="Example", url=FEED_URL, category='general')
+
+    def ingest(self, count):
+        items = "".join(
+            f"<item><title>Story {i}</title><link>https://example.com/{i}</link><guid>guid-{i}</guid>"
+            f"<description>Body {i}</description><pubDate>Mon, 06 Jan 2025 12:00:00 GMT</pubDate></item>"
+            for i in range(count)
+        )
+        rss = f'<rss version="2.0"><channel><title>Example</title>{items}</channel></rss>'.encode()
+        result = FetchResult(FEED_URL, status=200, content=rss, headers={'etag': '"v1"'})
+        with mock.patch("blog.pipeline.iter_feeds", return_value=[result]):
+            saved = fetch_and_save([self.feed])
+        self.feed.refresh_from_db()
+        return saved
+
+    @override_settings(INGEST_WRITE_BATCH=4)
+    def test_busy_feed_is_stored_completely(self):
+        self.assertEqual(self.ingest(10), 10)
+        self.assertEqual(GeneralContent.objects.count(), 10)
+        self.assertEqual(self.feed.etag, '"v1"')
+
+    @override_settings(INGEST_PARSE_PROCESSES=2)
+    def test_parsing_in_a_process_pool(self):
+        self.assertEqual(self.ingest(10), 10)
+        self.assertEqual(
+            sorted(GeneralContent.objects.values_list('link', flat=True)),
+            sorted(f"https://example.com/{i}" for i in range(10)),
+        )
+
+    @override_settings(INGEST_MAX_ITEMS_PER_RUN=4)
+    def test_item_budget_leaves_the_rest_for_a_quick_refetch(self):
+        started = timezone.now()
+        self.assertEqual(self.ingest(10), 4)
+        # No validators, so the next fetch is a full download that picks up the rest
+        self.assertEqual(self.feed.etag, '')
+        self.assertLessEqual(self.feed.next_fetch_at, started + timedelta(minutes=16))
+
+        self.assertEqual(self.ingest(10), 4)
+        self.assertEqual(self.ingest(10), 2)
+        self.assertEqual(self.feed.etag, '"v1"')
+        self.assertEqual(GeneralContent.objects.count(), 10)
+
+
+class NearDuplicateTestCase(TestCase):
+    STORY = (
+        "Django 5.2 released with composite primary keys, automatic model imports in the shell "
+        "and a long list of smaller improvements for forms, the ORM and the admin"
+    )
+
+    def make_feed(self, site, title, description):
+        return feedparser.parse(
+            f'<rss version="2.0"><channel><title>{site}</title><item><title>{title}</title>'
+            f'<link>https://{site}/story</link><guid>https://{site}/story</guid><description>{description}</description>'
+            f'<pubDate>Mon, 06 Jan 2025 12:00:00 GMT</pubDate></item></channel></rss>'
+        )
+
+    def test_same_story_is_stored_once_across_categories(self):
+        self.assertEqual(save_new_contents(
+            self.make_feed("news.example.com", "Django 5.2 released", self.STORY), GeneralContent,
+        ), 1)
+        self.assertEqual(ContentFingerprint.objects.get().content_model, 'generalcontent')
+
+        # Syndicated copy with a different link and a slightly different summary
+        copy = self.make_feed("blog.example.org", "Django 5.2 released", self.STORY + " today")
+        with self.assertNumQueries(2):
+            self.assertEqual(save_new_contents(copy, PythonContent), 0)
+
+        other = self.make_feed("blog.example.org", "Python 3.14 beta", (
+            "The first beta of Python 3.14 brings template strings, deferred annotations "
+            "and an experimental free-threaded build to try"
+        ))
+        self.assertEqual(save_new_contents(other, PythonContent), 1)
+
+    def test_short_texts_are_not_fingerprinted(self):
+        save_new_contents(self.make_feed("jobs.example.com", "Python developer", "Remote"), GeneralContent)
+        self.assertFalse(ContentFingerprint.objects.exists())
+
+    def test_rows_skipped_on_conflict_are_not_reported(self):
+        feed = self.make_feed("news.example.com", "Django 5.2 released", self.STORY)
+        self.assertEqual(save_new_contents(feed, GeneralContent), 1)
+        self.assertEqual(read_stats()['content:general'], 1)
+
+        # An overlapping run that checked for duplicates before this one's rows were committed
+        with mock.patch("blog.utils.dedup_entries", side_effect=lambda entries: entries):
+            self.assertEqual(save_new_contents(feed, GeneralContent), 0)
+        self.assertEqual(GeneralContent.objects.count(), 1)
+        self.assertEqual(ContentFingerprint.objects.count(), 1)
+        self.assertEqual(read_stats()['content:general'], 1)
+
+
+class CanonicalLinkTestCase(TestCase):
+    def test_tracking_variants_of_a_link_are_one_entry(self):
+        GeneralContent.objects.create(
+            title="Story", description="Body", pub_date="2025-01-06T12:00:00Z",
+            link="https://Example.com/story?id=7", content_name="Example", guid="",
+        )
+        stored = GeneralContent.objects.get()
+        self.assertIsNone(stored.guid_hash)
+        self.assertIsNotNone(stored.link_hash)
+
+        feed = feedparser.parse(
+            '<rss version="2.0"><channel><title>Example</title><item><title>Story</title>'
+            '<link>HTTPS://example.com:443/story?utm_source=rss&amp;id=7#comments</link>'
+            '<description>Body</description><pubDate>Mon, 06 Jan 2025 12:00:00 GMT</pubDate></item>'
+            '<item><title>Other</title><link>https://example.com/other?utm_medium=feed</link>'
+            '<description>Other body</description><pubDate>Mon, 06 Jan 2025 12:00:00 GMT</pubDate></item>'
+            '</channel></rss>'
+        )
+        with self.assertNumQueries(5):
+            self.assertEqual(save_new_contents(feed, GeneralContent), 1)
+        self.assertEqual(GeneralContent.objects.get(title="Other").link, "https://example.com/other")
@@ -42,6 +42,23 @@ class MobilePcContentTestCase(GeneralContentTestCase):
     model = MobilePcContent
 
 
+class ContentTableTestCase(TestCase):
+    def setUp(self):
+        for model in (GeneralContent, PythonContent):
+            model.objects.create(
+                title="Same story", description="Body", pub_date="2022-06-01T12:00:00Z",
+                link="http://www.testlink.com", content_name="Example", guid="12345",
+            )
+
+    def test_category_proxies_share_one_table(self):
+        self.assertEqual(GeneralContent.objects.get().category, 'general')
+        self.assertEqual(PythonContent.objects.get().category, 'python')
+        self.assertEqual(JobUpdatesContent.objects.count(), 0)
+        self.assertEqual(
+            list(Content.objects.order_by('category').values_list('category', flat=True)), ['general', 'python'],
+        )
+
+
 # ----------------------------------TEST CASES FOR FORUM APP MODELS-------------------------------------------------#
 
 class CategoryModelTestCase(TestCase):
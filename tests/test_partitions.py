@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone as django_timezone
+
+from blog.models import CATEGORY_CONTENT_MODELS, Content, GeneralContent
+from blog.partitions import (
+    convert_to_partitioned, create_partitions, drop_expired_partitions, is_partitioned, list_partitions,
+    next_period, partition_name, period_start,
+)
+from medical_imaging.models import MedicalImagingContent
+
+
+class PartitionPeriodTestCase(SimpleTestCase):
+    moment = datetime(2026, 12, 30, 18, 45, tzinfo=timezone.utc)
+
+    def test_monthly_periods(self):
+        start = period_start(self.moment, 'month')
+        self.assertEqual(start, datetime(2026, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(next_period(start, 'month'), datetime(2027, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(partition_name(start, 'month'), 'blog_content_2026_12')
+
+    def test_weekly_periods_start_on_monday(self):
+        start = period_start(self.moment, 'week')
+        self.assertEqual(start, datetime(2026, 12, 28, tzinfo=timezone.utc))
+        self.assertEqual(next_period(start, 'week'), datetime(2027, 1, 4, tzinfo=timezone.utc))
+        self.assertEqual(partition_name(start, 'week'), 'blog_content_2026_w53')
+
+    def test_unknown_interval(self):
+        with self.assertRaises(ValueError):
+            period_start(self.moment, 'day')
+
+
+class PartitionCommandTestCase(TestCase):
+    @skipUnless(connection.vendor != 'postgresql', "checks the error on other databases")
+    def test_needs_postgresql(self):
+        self.assertFalse(is_partitioned())
+        with self.assertRaises(CommandError):
+            call_command('content_partitions', '--convert')
+
+
+@skipUnless(connection.vendor == 'postgresql', "partitioning needs PostgreSQL")
+class PartitionedTableTestCase(TransactionTestCase):
+    """Converts the test database's content table for real.
+
+    It stays partitioned afterwards, which is why this is a TransactionTestCase:
+    those run after every TestCase.
+    """
+
+    def entry(self, model, name, pub_date):
+        return model.objects.create(
+            title=name, description="Body", pub_date=pub_date, link=f"https://example.com/{name}",
+            content_name="Example", guid=name,
+        )
+
+    def partition_of(self, content):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM blog_content WHERE id = %s", [content.pk])
+            return cursor.fetchone()[0]
+
+    def test_convert_create_and_drop(self):
+        now = django_timezone.now()
+        expired = self.entry(GeneralContent, "expired", now - timedelta(days=400))
+        medical = self.entry(MedicalImagingContent, "medical", now - timedelta(days=460))
+        ahead = self.entry(GeneralContent, "ahead", now + timedelta(days=40))
+
+        created = convert_to_partitioned('month')
+        self.assertTrue(is_partitioned())
+        self.assertEqual(len(created), 4)
+        # Rows dated in a period created by the conversion are moved out of the default partition
+        self.assertEqual(self.partition_of(ahead), partition_name(period_start(ahead.pub_date, 'month'), 'month'))
+        self.assertEqual(self.partition_of(expired), 'blog_content_default')
+
+        fresh = self.entry(GeneralContent, "fresh", next_period(period_start(now, 'month'), 'month'))
+        self.assertIn(fresh.pk, set(Content.objects.values_list('pk', flat=True)))
+        self.assertGreater(fresh.pk, ahead.pk)
+
+        # Past periods can still be split out of the default partition
+        for content in (expired, medical):
+            create_partitions(ahead=0, interval='month', now=content.pub_date)
+            self.assertEqual(self.partition_of(content), partition_name(period_start(content.pub_date, 'month'), 'month'))
+
+        dropped = drop_expired_partitions(now - timedelta(days=365), CATEGORY_CONTENT_MODELS)
+        self.assertEqual(dropped, [partition_name(period_start(expired.pub_date, 'month'), 'month')])
+        self.assertFalse(Content.objects.filter(pk=expired.pk).exists())
+        # The medical imaging entry isn't retention's to delete, so its partition stays
+        self.assertTrue(Content.objects.filter(pk=medical.pk).exists())
+        self.assertIn(self.partition_of(medical), [name for name, _ in list_partitions()])
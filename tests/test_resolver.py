@@ -0,0 +1,55 @@
+import socket
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from blog.resolver import safe_resolver
+from blog.utils import _is_safe_url, image_session
+
+
+def answer(*addresses):
+    return mock.patch("blog.resolver.socket.gethostbyname_ex", return_value=("host", [], list(addresses)))
+
+
+class SafeResolverTestCase(SimpleTestCase):
+    def setUp(self):
+        safe_resolver.clear()
+
+    def test_answers_and_refusals_are_cached(self):
+        with answer("93.184.216.34") as lookup:
+            self.assertTrue(_is_safe_url("https://cdn.example.com/a.jpg"))
+            self.assertTrue(_is_safe_url("https://CDN.example.com./b.jpg"))
+        self.assertEqual(lookup.call_count, 1)
+
+        with answer("10.0.0.5") as lookup:
+            self.assertFalse(_is_safe_url("https://intranet.example.com/a.jpg"))
+            self.assertFalse(_is_safe_url("https://intranet.example.com/b.jpg"))
+        self.assertEqual(lookup.call_count, 1)
+
+        with mock.patch("blog.resolver.socket.gethostbyname_ex", side_effect=socket.gaierror) as lookup:
+            self.assertIsNone(safe_resolver.resolve("nowhere.example.com"))
+            self.assertIsNone(safe_resolver.resolve("nowhere.example.com"))
+        self.assertEqual(lookup.call_count, 1)
+
+    def test_any_private_address_makes_the_host_unsafe(self):
+        with answer("93.184.216.34", "127.0.0.1"):
+            self.assertIsNone(safe_resolver.resolve("mixed.example.com"))
+        self.assertIsNone(safe_resolver.resolve("169.254.169.254"))
+        self.assertEqual(safe_resolver.resolve("93.184.216.34"), "93.184.216.34")
+
+    def test_connection_is_pinned_to_the_checked_address(self):
+        with answer("93.184.216.34"):
+            self.assertTrue(_is_safe_url("http://cdn.example.com/a.jpg"))
+        # The host now rebinds to an internal address, but the cached verdict wins
+        with answer("127.0.0.1"), \
+                mock.patch("blog.resolver.create_connection", side_effect=OSError("unreachable")) as connect:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                image_session.get("http://cdn.example.com/a.jpg", timeout=1)
+        self.assertEqual(connect.call_args.args[0], ("93.184.216.34", 80))
+
+    def test_private_addresses_are_refused_at_connect_time(self):
+        with mock.patch("blog.resolver.create_connection") as connect:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                image_session.get("http://127.0.0.1:8000/a.jpg", timeout=1)
+        connect.assert_not_called()
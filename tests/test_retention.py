@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from blog.models import ContentFingerprint, GeneralContent, JobUpdatesContent
+from blog.retention import delete_in_batches
+from blog.tasks import cleanup_old_content
+
+
+def make_content(model, count, age_days):
+    pub_date = timezone.now() - timedelta(days=age_days)
+    for i in range(count):
+        model.objects.create(
+            title=f"Story {i}", description="Body", pub_date=pub_date, content_name="Example",
+            link=f"https://example.com/{model.__name__}/{age_days}/{i}", guid=f"{model.__name__}-{age_days}-{i}",
+        )
+
+
+@override_settings(RETENTION_DELETE_PAUSE=0)
+class RetentionTestCase(TestCase):
+    def test_deletes_in_capped_batches(self):
+        make_content(GeneralContent, 7, age_days=40)
+        make_content(GeneralContent, 2, age_days=1)
+        expired = GeneralContent.objects.filter(pub_date__lt=timezone.now() - timedelta(days=30))
+        # Each batch is one lookup of its upper pk plus one DELETE; the last batch has no upper pk
+        with self.assertNumQueries(2 * 4):
+            self.assertEqual(delete_in_batches(expired, batch_size=2), 7)
+        self.assertEqual(GeneralContent.objects.count(), 2)
+
+    @override_settings(CONTENT_RETENTION_DAYS=30, CONTENT_RETENTION_OVERRIDES={'jobs': 7})
+    def test_retention_window_per_category(self):
+        for model in (GeneralContent, JobUpdatesContent):
+            make_content(model, 2, age_days=10)
+            make_content(model, 1, age_days=40)
+        ContentFingerprint.objects.create(
+            content_model='generalcontent', simhash=1, band_0=1, band_1=0, band_2=0, band_3=0,
+            pub_date=timezone.now() - timedelta(days=10),
+        )
+
+        self.assertEqual(cleanup_old_content(), 4)
+        self.assertEqual(GeneralContent.objects.count(), 2)
+        self.assertEqual(JobUpdatesContent.objects.count(), 0)
+        # Still inside the longest window, so it stays for the general entry it stands for
+        self.assertEqual(ContentFingerprint.objects.count(), 1)
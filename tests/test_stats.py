@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import GeneralContent, SiteStat, UserBookmark
+from blog.retention import purge_expired
+from blog.stats import content_counter, increment, read_stats, reconcile
+from forum.models import Post
+from medical_imaging.models import ArticleComment, MedicalImagingArticle
+
+
+class SiteStatsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader', password='secret')
+        self.story(1)
+        reconcile()
+
+    def story(self, i, pub_date=None):
+        return GeneralContent.objects.create(
+            title=f"Story {i}", description="Body", pub_date=pub_date or timezone.now(),
+            link=f"https://example.com/{i}", content_name="Example", guid=f"guid-{i}",
+        )
+
+    def assertInStep(self):
+        """The incrementally kept counters match a recount."""
+        stats = read_stats()
+        SiteStat.objects.all().delete()
+        self.assertEqual(stats, read_stats())
+        return stats
+
+    def test_signals_keep_counters_in_step(self):
+        staff = User.objects.create_user('editor', password='secret', is_staff=True)
+        UserBookmark.objects.create(user=self.user, content_type='general', content_id=1, title="Story 1")
+        Post.objects.create(title="Hello", body="Body", author=self.user)
+        article = MedicalImagingArticle.objects.create(
+            author=staff, title="Scanner", summary="Summary", body="Body", primary_topic='mri',
+        )
+        self.story(2)
+        article = MedicalImagingArticle.objects.get(pk=article.pk)
+        article.status = 'published'
+        article.save()
+        self.user.is_staff = True
+        self.user.save()
+
+        stats = self.assertInStep()
+        self.assertEqual(stats['users'], 2)
+        self.assertEqual(stats['users.staff'], 2)
+        self.assertEqual(stats['users.joined'], 2)
+        self.assertEqual(stats['bookmarks.created'], 1)
+        self.assertEqual(stats['medical_articles.published'], 1)
+        self.assertEqual(stats['medical_articles.draft'], 0)
+        self.assertEqual(stats['content:general'], 2)
+
+        staff.delete()
+        stats = self.assertInStep()
+        self.assertEqual(stats['users'], 1)
+        self.assertEqual(stats['medical_articles'], 0)
+
+    def test_retention_decrements_content(self):
+        self.story(2, pub_date=timezone.now() - timedelta(days=400))
+        self.assertEqual(read_stats()['content:general'], 2)
+        purge_expired()
+        self.assertEqual(self.assertInStep()['content:general'], 1)
+
+    def test_dashboard_reads_counters_in_one_query(self):
+        self.client.force_login(User.objects.create_user('admin', password='secret', is_staff=True))
+        for i in range(2, 6):
+            self.story(i)
+        with self.assertNumQueries(1):
+            stats = read_stats()
+        response = self.client.get(reverse('blog:admin-dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['stats']['total_general'], stats['content:general'])
+        self.assertEqual(response.context['total_users'], 2)
+
+    def test_missing_totals_wait_for_reconcile(self):
+        SiteStat.objects.all().delete()
+        increment({content_counter('general'): 5, 'users.joined:2026-10-17': 1})
+        self.assertFalse(SiteStat.objects.filter(name=content_counter('general')).exists())
+        self.assertEqual(SiteStat.objects.get(name='users.joined:2026-10-17').value, 1)
+        self.assertEqual(read_stats()['content:general'], 1)
+
+    def test_comment_moderation_actions(self):
+        admin = User.objects.create_user('admin', password='secret', is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        article = MedicalImagingArticle.objects.create(
+            author=admin, title="Scanner", summary="Summary", body="Body", primary_topic='mri',
+        )
+        comments = [
+            ArticleComment.objects.create(article=article, author=self.user, body=f"Comment {i}", is_approved=i == 0)
+            for i in range(3)
+        ]
+        self.assertEqual(read_stats()['comments.pending'], 2)
+        url = reverse('admin:medical_imaging_articlecomment_changelist')
+        selected = [comment.pk for comment in comments]
+
+        self.client.post(url, {'action': 'approve_comments', '_selected_action': selected})
+        self.assertEqual(self.assertInStep()['comments.pending'], 0)
+
+        self.client.post(url, {'action': 'reject_comments', '_selected_action': selected[:2]})
+        self.assertEqual(self.assertInStep()['comments.pending'], 2)
@@ -1,7 +1,19 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.core import mail
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, RequestFactory
 from django.urls import reverse
 
+from blog.models import GeneralContent, MedicalNewsContent
+from blog.pagination import KeysetPaginator
+from blog.utils import Entry, write_entries
+from blog.views import HomePageView, PythonPageView
+from forum import context_processors
+from forum.context_processors import get_recent_posts
 from forum.models import Category, Post, Comments
 
 
@@ -43,6 +55,193 @@ class MobilePcViewTestCase(HomePageViewTestCase):
     template = 'mobile-pcpage.html'
 
 
+class ListingQueryPlanTestCase(TestCase):
+    """Category pages must read the partial listing index, not scan and sort the content table."""
+
+    def plan(self, view_class):
+        view = view_class()
+        view.setup(RequestFactory().get('/'))
+        queryset = view.get_queryset()[:view.paginate_by]
+        if connection.vendor == 'postgresql':
+            # Small test tables are cheaper to scan, so make the planner show what it would do at scale
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_listing_uses_the_partial_index(self):
+        for view_class in (HomePageView, PythonPageView):
+            plan = self.plan(view_class)
+            self.assertIn('blog_content_listing', plan)
+            self.assertNotRegex(plan, r'(?i)seq scan|\bscan blog_content\b|temp b-tree|\bsort\b')
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        # Pairs of entries share a pub_date, so paging has to break ties on id
+        for i in range(25):
+            GeneralContent.objects.create(
+                title=f"Story {i}", description="Body", pub_date=f"2025-01-{1 + i // 2:02d}T12:00:00Z",
+                link=f"https://example.com/{i}", content_name="Example", guid=f"guid-{i}",
+                image="https://example.com/image.jpg",
+            )
+        self.paginator = KeysetPaginator(HomePageView.model.objects.filter(image__isnull=False), 10)
+
+    def test_pages_cover_every_entry_once(self):
+        titles, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                page = self.paginator.page(cursor)
+            titles += [content.title for content in page]
+            if not page.has_next():
+                break
+            cursor = page.next_page_number()
+        self.assertEqual(titles, [f"Story {i}" for i in reversed(range(25))])
+        self.assertFalse(page.has_next())
+
+        previous = self.paginator.page(page.previous_page_number())
+        self.assertEqual([content.title for content in previous], [f"Story {i}" for i in range(14, 4, -1)])
+        first = self.paginator.page(previous.previous_page_number())
+        self.assertFalse(first.has_previous())
+        self.assertEqual(first[0].title, "Story 24")
+
+    def test_deep_pages_seek_on_the_index(self):
+        cursor = self.paginator.page().next_page_number()
+        plan = self.paginator.page_queryset(cursor).explain()
+        self.assertNotRegex(plan, r'(?i)seq scan|temp b-tree')
+
+    def test_cursor_links_and_invalid_cursors(self):
+        for i in range(25):
+            MedicalNewsContent.objects.create(
+                title=f"News {i}", description="Body", pub_date="2025-01-01T12:00:00Z",
+                link=f"https://example.com/news/{i}", content_name="Example", guid=f"news-{i}",
+            )
+        response = self.client.get(reverse('medical_imaging:medical_news'))
+        page = response.context['page_obj']
+        self.assertTrue(response.context['is_paginated'])
+        self.assertContains(response, f'?page={page.next_page_number()}')
+
+        response = self.client.get(reverse('medical_imaging:medical_news'), {'page': page.next_page_number()})
+        self.assertEqual(len(response.context['contents']), 5)
+        self.assertEqual(self.client.get('/', {'page': 'not-a-cursor'}).status_code, 404)
+
+
+class ListingPageTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.story(1)
+
+    def story(self, i, pub_date=None):
+        return GeneralContent.objects.create(
+            title=f"Story {i}", description="Body", pub_date=pub_date or f"2025-01-{i:02d}T12:00:00Z",
+            link=f"https://example.com/{i}", content_name="Example", guid=f"guid-{i}",
+            image="https://example.com/image.jpg",
+        )
+
+
+class PageCacheTestCase(ListingPageTestCase):
+    def test_repeat_anonymous_requests_are_served_from_cache(self):
+        first = self.client.get('/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/')
+        self.assertEqual(second.content, first.content)
+        self.assertContains(second, "Story 1")
+
+    def test_new_content_invalidates_the_category(self):
+        self.client.get('/')
+        self.client.get(reverse('medical_imaging:medical_news'))
+        self.story(2)
+        self.assertContains(self.client.get('/'), "Story 2")
+        # Other categories keep their cached pages
+        with self.assertNumQueries(0):
+            self.client.get(reverse('medical_imaging:medical_news'))
+
+    def test_ingest_bumps_the_version(self):
+        self.client.get('/')
+        entry = Entry(
+            GeneralContent, None, "Example", "ingested", "https://example.com/new", "2025-01-03T12:00:00Z",
+            "Ingested", "Body", [], [], image="https://example.com/image.jpg",
+        )
+        write_entries([entry])
+        self.assertContains(self.client.get('/'), "Ingested")
+
+    def test_signed_in_users_bypass_the_cache(self):
+        self.client.get('/')
+        self.client.force_login(User.objects.create_user('reader', password='secret'))
+        response = self.client.get('/')
+        self.assertTemplateUsed(response, 'index.html')
+        self.assertIsNotNone(response.context)
+
+
+class ConditionalResponseTestCase(ListingPageTestCase):
+    def setUp(self):
+        # One clock for the version times and the Last-Modified check, moved on by hand
+        self.now = float(int(time.time())) + 0.5
+        clock = mock.patch('time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        super().setUp()
+
+    def later(self, seconds=2):
+        self.now += seconds
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.client.get('/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.story(2)
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Story 2")
+
+    def test_if_modified_since_stops_matching_after_changes(self):
+        self.client.get('/')  # starts the recent-posts version
+        self.later()
+        first = self.client.get('/')
+        self.assertIn('no-cache', first['Cache-Control'])
+        self.later()
+        self.assertEqual(self.client.get('/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+
+        # A late entry, older than the newest one on the page
+        self.story(9, pub_date="2024-12-31T12:00:00Z")
+        self.later()
+        response = self.client.get('/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Story 9")
+
+        # A new forum post only changes the sidebar
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title="Sidebar", body="Sidebar post")
+        self.later()
+        self.assertContains(self.client.get('/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']), "Sidebar post")
+
+    def test_no_last_modified_within_the_changing_second(self):
+        self.assertFalse(self.client.get('/').has_header('Last-Modified'))
+        self.later()
+        self.assertTrue(self.client.get('/').has_header('Last-Modified'))
+
+    def test_pages_have_their_own_etag(self):
+        for i in range(2, 23):
+            self.story(i)
+        first = self.client.get('/')
+        second = self.client.get('/', {'page': first.context['page_obj'].next_page_number()})
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_new_build_changes_the_etag(self):
+        etag = self.client.get('/')['ETag']
+        with self.settings(BUILD_ID='next-deploy'):
+            response = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_signed_in_users_get_no_validators(self):
+        self.client.force_login(User.objects.create_user('reader', password='secret'))
+        self.assertFalse(self.client.get('/').has_header('ETag'))
+
+
 # --------------------------------------------TEST CASES FOR FORUM VIEWS-------------------------------------------#
 
 class IndexViewTestCase(TestCase):
@@ -114,3 +313,44 @@ class PostViewTestCase(TestCase):
         response = self.client.get(reverse('forum:post', kwargs={'pk': self.post.pk}))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "How to build a website")
+
+
+class RecentPostsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(4):
+            Post.objects.create(title=f"Post {i}", body=f"Body of post {i}")
+
+    def create_post(self, i):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(title=f"Post {i}", body=f"Body of post {i}")
+
+    def test_not_queried_unless_used(self):
+        with self.assertNumQueries(0):
+            get_recent_posts(None)
+
+    def test_cached_until_a_post_changes(self):
+        with self.assertNumQueries(1):
+            posts = list(get_recent_posts(None)['recent_posts'])
+        self.assertEqual([post.title for post in posts], ["Post 3", "Post 2", "Post 1"])
+        with self.assertNumQueries(0):
+            list(get_recent_posts(None)['recent_posts'])
+
+        self.create_post(4)
+        self.assertEqual(get_recent_posts(None)['recent_posts'][0].title, "Post 4")
+        with self.captureOnCommitCallbacks(execute=True):
+            posts[0].delete()
+        self.assertNotIn("Post 3", [post.title for post in get_recent_posts(None)['recent_posts']])
+
+    def test_cached_pages_show_new_posts(self):
+        self.assertContains(self.client.get('/'), "Body of post 3")
+        self.create_post(4)
+        self.assertContains(self.client.get('/'), "Body of post 4")
+
+    def test_stale_copy_in_another_process(self):
+        self.assertContains(self.client.get('/'), "Body of post 3")
+        stale = dict(context_processors._local)
+        self.create_post(4)
+        # Another web process still holds the list from before the post
+        context_processors._local.update(stale)
+        self.assertContains(self.client.get('/'), "Body of post 4")